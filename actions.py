@@ -0,0 +1,9 @@
+import itertools
+
+# Each discrete action is the (accel, left, right, shoot) Ship controls it
+# sets, covering every combination of thrust, turning and shooting
+ACTIONS = [(accel, turn == "left", turn == "right", shoot)
+           for accel, turn, shoot in itertools.product(
+               (0, 1, -1), (None, "left", "right"), (False, True))]
+NUM_ACTIONS = len(ACTIONS)
+NOOP = 0  # Coast straight without shooting
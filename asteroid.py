@@ -8,6 +8,41 @@ AST_SPEED_MAX = 25
 AST_SPEED_MIN = 10
 BUMP_PERCENTAGE = 0.1  # What percentage of the radii the random bumps can be
 NUM_VERTS = 15
+NUM_TEMPLATES = 16  # Outlines pre-generated for each level
+TEMPLATE_SEED = 0  # Seed the outlines are generated from
+# rot_vel is in degrees per tick at the 60 ticks/s the game was tuned at,
+# where each tick updates with this dt (world.SPEED_PER_SECOND / TICK_RATE)
+SPIN_DT = 3.6 / 60
+
+
+def makeTemplates(radius, count, rng):
+    """Generate randomly bumped outlines around the origin at angle 0
+
+    Arguments:
+    radius -- radius the bumps vary around
+    count -- number of outlines to generate
+    rng -- random.Random to draw bumps from
+
+    Returns a list of (outline, extent) pairs, where extent is the distance
+    of the outline's farthest vertex
+    """
+    templates = []
+    angle_inc = 360 / NUM_VERTS
+    for i in range(count):
+        outline = []
+        angle = 0
+        for j in range(NUM_VERTS):
+            new_radius = radius + radius * \
+                ((rng.random() * 2 * BUMP_PERCENTAGE) - BUMP_PERCENTAGE)
+            vert_vec = vec2(0, 1)
+            vert_vec.scale_to_length(new_radius)  # Scale to new radius
+            vert_vec = vert_vec.rotate(angle)  # Rotate to proper position
+            outline.append(vert_vec)
+            angle += angle_inc
+        outline = tuple(outline)
+        templates.append(
+            (outline, max(vert.magnitude() for vert in outline)))
+    return templates
 
 
 class Asteroid:
@@ -18,19 +53,23 @@ class Asteroid:
     split_angle_min = 80
     vel_lim = 50
     rot_vel_lim = 5
+    templates = []  # Outline templates of each level, filled in below
 
-    def __init__(self, surface, pos, vel, rot_vel, level):
+    def __init__(self, surface, pos, vel, rot_vel, level, shape=None):
         """Create an Asteroid object
 
         Arguments:
         surface -- pygame.Surface to draw the Asteroid on
         pos -- initial position of Asteroid
         vel -- inital velocity of Asteroid
-        rot_vel -- rotational velocity of Asteroid
+        rot_vel -- rotational velocity of Asteroid in degrees per SPIN_DT
         level -- which level of radius Asteroid is
+        shape -- which outline template of the level to use. None to pick
+                 one at random
         """
         self.surface = surface
         self.pos = vec2(pos)
+        self.prev_pos = vec2(pos)  # position at previous tick, for drawing
         self.vel = vec2(vel)
         self.rot_vel = max(  # Clamp rotational speed
             min(rot_vel, Asteroid.rot_vel_lim), -Asteroid.rot_vel_lim)
@@ -38,27 +77,28 @@ class Asteroid:
             self.vel.scale_to_length(Asteroid.vel_lim)
         self.level = level  # Which level asteroid this is
         self.radius = Asteroid.radii[level]
-        self.verts = []
-        angle = 0
-        angle_inc = 360 / NUM_VERTS
-        x_min, x_max, y_min, y_max = None, None, None, None  # Track for rect
-        for i in range(NUM_VERTS):
-            new_radius = self.radius + self.radius * \
-                ((random.random() * 2 * BUMP_PERCENTAGE) - BUMP_PERCENTAGE)
-            vert_vec = vec2(0, 1)
-            vert_vec.scale_to_length(new_radius)  # Scale to new radius
-            vert_vec = vert_vec.rotate(angle)  # Rotate to proper position
-            vert_vec = self.pos + vert_vec  # Translate to screen position
-            x_min = vert_vec.x if x_min == None or vert_vec.x < x_min else x_min
-            x_max = vert_vec.x if x_max == None or vert_vec.x > x_max else x_max
-            y_min = vert_vec.y if y_min == None or vert_vec.y < y_min else y_min
-            y_max = vert_vec.y if y_max == None or vert_vec.y > y_max else y_max
-            self.verts.append(vert_vec)
-            angle += angle_inc
-        self.rect = pygame.Rect(x_min, y_min, x_max - x_min, y_max - y_min)
+        # Outline relative to pos at angle 0, never changed after creation
+        if shape is None:
+            shape = random.randrange(NUM_TEMPLATES)
+        self.shape = shape
+        self.outline, self.extent = Asteroid.templates[level][shape]
+        self.angle = 0  # Rotation of outline in degrees
+        self.world_verts = None  # Cached verts, cleared each update
+        self.rect = pygame.Rect(0, 0, 2 * self.extent, 2 * self.extent)
+        self.rect.center = self.pos
         self.reenter = \
-            x_max < 0 or x_min > SCREEN_WIDTH or \
-            y_max < 0 or y_min > SCREEN_HEIGHT
+            self.pos.x + self.extent < 0 or \
+            self.pos.x - self.extent > SCREEN_WIDTH or \
+            self.pos.y + self.extent < 0 or \
+            self.pos.y - self.extent > SCREEN_HEIGHT
+
+    @property
+    def verts(self):
+        """Screen space vertices of Asteroid, computed once per update"""
+        if self.world_verts is None:
+            self.world_verts = [self.pos + vert.rotate(self.angle)
+                                for vert in self.outline]
+        return self.world_verts
 
     def update(self, dt):
         """Update state of Asteroid
@@ -66,46 +106,32 @@ class Asteroid:
         Arguments:
         dt -- the delta time to update with
         """
+        self.prev_pos = vec2(self.pos)
         self.pos += self.vel * dt
-        x_min, x_max, y_min, y_max = None, None, None, None  # Track for rect
-        for i in range(len(self.verts)):
-            self.verts[i] += self.vel * dt
-            temp = self.verts[i] - self.pos
-            temp = temp.rotate(self.rot_vel)
-            self.verts[i] = self.pos + temp
-            x_min = self.verts[i].x if x_min == None or self.verts[i].x < x_min else x_min
-            x_max = self.verts[i].x if x_max == None or self.verts[i].x > x_max else x_max
-            y_min = self.verts[i].y if y_min == None or self.verts[i].y < y_min else y_min
-            y_max = self.verts[i].y if y_max == None or self.verts[i].y > y_max else y_max
-        self.rect.left = x_min
-        self.rect.right = x_max
-        self.rect.top = y_min
-        self.rect.bottom = y_max
+        self.angle = (self.angle + self.rot_vel * dt / SPIN_DT) % 360
+        self.world_verts = None
+        size = 2 * self.extent
 
         # Wrap screen
-        if not self.reenter and self.rect.right < 0:
+        wrapped = not self.reenter
+        if not self.reenter and self.pos.x + self.extent < 0:
             self.reenter = True
-            self.pos.x += SCREEN_WIDTH + self.rect.width
-            for vert in self.verts:
-                vert.x += SCREEN_WIDTH + self.rect.width
-        elif not self.reenter and self.rect.left > SCREEN_WIDTH:
+            self.pos.x += SCREEN_WIDTH + size
+        elif not self.reenter and self.pos.x - self.extent > SCREEN_WIDTH:
             self.reenter = True
-            self.pos.x -= SCREEN_WIDTH + self.rect.width
-            for vert in self.verts:
-                vert.x -= SCREEN_WIDTH + self.rect.width
+            self.pos.x -= SCREEN_WIDTH + size
 
-        if not self.reenter and self.rect.top < 0:
+        if not self.reenter and self.pos.y - self.extent < 0:
             self.reenter = True
-            self.pos.y += SCREEN_HEIGHT + self.rect.height
-            for vert in self.verts:
-                vert.y += SCREEN_HEIGHT + self.rect.height
-        elif not self.reenter and self.rect.bottom > SCREEN_HEIGHT:
+            self.pos.y += SCREEN_HEIGHT + size
+        elif not self.reenter and self.pos.y + self.extent > SCREEN_HEIGHT:
             self.reenter = True
-            self.pos.y -= SCREEN_HEIGHT + self.rect.height
-            for vert in self.verts:
-                vert.y -= SCREEN_HEIGHT + self.rect.height
+            self.pos.y -= SCREEN_HEIGHT + size
+        wrapped = wrapped and self.reenter
 
         self.rect.center = self.pos
+        if wrapped:  # Don't interpolate across the screen
+            self.prev_pos = vec2(self.pos)
 
         if self.reenter:
             self.reenter = \
@@ -114,38 +140,27 @@ class Asteroid:
                 self.pos.y + self.radius >= 0 and \
                 self.pos.y - self.radius <= SCREEN_HEIGHT
 
-    def show(self):
-        """Draw the Asteroid to the given surface based on Asteroid state"""
-        int_pos = (int(self.pos.x), int(self.pos.y))
+    def show(self, alpha=1):
+        """Draw the Asteroid to the given surface based on Asteroid state
+
+        Arguments:
+        alpha -- Fraction of the way from the previous tick to draw Asteroid at
+        """
+        offset = self.prev_pos.lerp(self.pos, alpha) - self.pos
         self.rect = pygame.draw.polygon(
-            self.surface, Asteroid.color, self.verts, 1)
+            self.surface, Asteroid.color, [vert + offset for vert in self.verts], 1)
         return self.rect
 
-    def split(self):
-        """Split Asteroid into smaller Asteroids and return a list"""
-        new_level = self.level - 1
-        if new_level < 0:
-            return []
-        new_radius = Asteroid.radii[new_level]
-        num_to_create = self.radius // new_radius
-        spawn_angle = random.randrange(
-            Asteroid.split_angle_min, Asteroid.split_angle_max)
-        base_vec = None
-        if self.vel.xy != (0, 0):
-            base_vec = vec2(self.vel).rotate(spawn_angle / 2)
-        to_ret = []
-        new_vel_mag = (len(Asteroid.radii) - new_level)*(self.radius * self.vel.magnitude()) / \
-            (num_to_create * new_radius)
-        for i in range(num_to_create):
-            spawn_vel = vec2(base_vec).rotate(-i*(spawn_angle //
-                                                  num_to_create)) if base_vec != None else vec2(0, 0)
-            if spawn_vel.xy != (0, 0):
-                spawn_vel.scale_to_length(new_vel_mag)
-            new_rot_vel = (spawn_vel.magnitude_squared() /
-                           self.vel.magnitude_squared()) * self.rot_vel
-            to_ret.append(
-                Asteroid(self.surface, self.pos, spawn_vel, new_rot_vel, new_level))
-        return to_ret
+    def split(self, rng=random, shape_rng=random):
+        """Split Asteroid into smaller Asteroids and return a list
+
+        Arguments:
+        rng -- random.Random to draw the split angle from
+        shape_rng -- random.Random to draw the new outline templates from
+        """
+        return Asteroid.splitFrom(
+            self.surface, self.pos, self.vel, self.rot_vel, self.level, rng,
+            shape_rng)
 
     def getupperleft(self):
         """Get the upper left corner of the bouning rectangle of Asteroid"""
@@ -156,37 +171,111 @@ class Asteroid:
         return pygame.Rect(self.rect)
 
     @classmethod
-    def genAsteroid(cls, surface):
-        """Create a randomized asteroid
+    def genParams(cls, rng=random, shape_rng=random):
+        """Draw the (pos, vel, rot_vel, level, shape) of a random asteroid
 
         Arguments:
-        surface -- pygame.Surface to draw asteroid to
+        rng -- random.Random to draw the side, position and velocity from
+        shape_rng -- random.Random to draw the outline template from
         """
-        side = random.randrange(4)  # Choose what side to start on
-        x = random.randrange(SCREEN_WIDTH)  # Choose random position on screen
-        y = random.randrange(SCREEN_HEIGHT)
-        level = random.randrange(len(cls.radii))  # Choose radius level
+        side = rng.randrange(4)  # Choose what side to start on
+        x = rng.randrange(SCREEN_WIDTH)  # Choose random position on screen
+        y = rng.randrange(SCREEN_HEIGHT)
+        level = rng.randrange(len(cls.radii))  # Choose radius level
         div_by = level + 1  # Scale velocity by radius of asteroid
 
         vel = None
         if side == 0:  # Top
             y = -cls.radii[level]
-            vel = (random.randrange(-AST_SPEED_MAX // div_by, AST_SPEED_MAX // div_by),
-                   random.randrange(AST_SPEED_MIN // div_by, AST_SPEED_MAX // div_by))
+            vel = (rng.randrange(-AST_SPEED_MAX // div_by, AST_SPEED_MAX // div_by),
+                   rng.randrange(AST_SPEED_MIN // div_by, AST_SPEED_MAX // div_by))
         elif side == 1:  # Right
             x = SCREEN_WIDTH + cls.radii[level]
-            vel = (-random.randrange(AST_SPEED_MIN // div_by, AST_SPEED_MAX // div_by),
-                   random.randrange(-AST_SPEED_MAX // div_by, AST_SPEED_MAX // div_by))
+            vel = (-rng.randrange(AST_SPEED_MIN // div_by, AST_SPEED_MAX // div_by),
+                   rng.randrange(-AST_SPEED_MAX // div_by, AST_SPEED_MAX // div_by))
         elif side == 2:  # Bottom
             y = SCREEN_HEIGHT + cls.radii[level]
-            vel = (random.randrange(-AST_SPEED_MAX // div_by, AST_SPEED_MAX // div_by), -
-                   random.randrange(AST_SPEED_MIN // div_by, AST_SPEED_MAX // div_by))
+            vel = (rng.randrange(-AST_SPEED_MAX // div_by, AST_SPEED_MAX // div_by), -
+                   rng.randrange(AST_SPEED_MIN // div_by, AST_SPEED_MAX // div_by))
         else:  # Left
             x = -cls.radii[level]
-            vel = (random.randrange(AST_SPEED_MIN // div_by, AST_SPEED_MAX // div_by),
-                   random.randrange(-AST_SPEED_MAX // div_by, AST_SPEED_MAX // div_by))
+            vel = (rng.randrange(AST_SPEED_MIN // div_by, AST_SPEED_MAX // div_by),
+                   rng.randrange(-AST_SPEED_MAX // div_by, AST_SPEED_MAX // div_by))
         vel_vec = vec2(vel)
         rot_vel = \
             cls.rot_vel_lim * (vel_vec.magnitude_squared() /
                                (AST_SPEED_MAX * AST_SPEED_MAX))
-        return cls(surface, vec2(x, y), vel_vec, rot_vel, level)
+        return (vec2(x, y), vel_vec, rot_vel, level,
+                shape_rng.randrange(NUM_TEMPLATES))
+
+    @classmethod
+    def genAsteroid(cls, surface, rng=random, shape_rng=random):
+        """Create a randomized asteroid
+
+        Arguments:
+        surface -- pygame.Surface to draw asteroid to
+        rng -- random.Random to draw the side, position and velocity from
+        shape_rng -- random.Random to draw the outline template from
+        """
+        return cls(surface, *cls.genParams(rng, shape_rng))
+
+    @classmethod
+    def splitParams(cls, pos, vel, rot_vel, level, rng=random,
+                    shape_rng=random):
+        """Get the (pos, vel, rot_vel, level, shape) of each piece of a split
+
+        Arguments:
+        pos -- position of the Asteroid being split
+        vel -- velocity of the Asteroid being split
+        rot_vel -- rotational velocity of the Asteroid being split
+        level -- which level of radius the Asteroid being split is
+        rng -- random.Random to draw the split angle from
+        shape_rng -- random.Random to draw the new outline templates from
+        """
+        radius = cls.radii[level]
+        new_level = level - 1
+        if new_level < 0:
+            return []
+        new_radius = cls.radii[new_level]
+        num_to_create = radius // new_radius
+        spawn_angle = rng.randrange(
+            cls.split_angle_min, cls.split_angle_max)
+        base_vec = None
+        if vel.xy != (0, 0):
+            base_vec = vec2(vel).rotate(spawn_angle / 2)
+        to_ret = []
+        new_vel_mag = (len(cls.radii) - new_level)*(radius * vel.magnitude()) / \
+            (num_to_create * new_radius)
+        for i in range(num_to_create):
+            spawn_vel = vec2(base_vec).rotate(-i*(spawn_angle //
+                                                  num_to_create)) if base_vec != None else vec2(0, 0)
+            if spawn_vel.xy != (0, 0):
+                spawn_vel.scale_to_length(new_vel_mag)
+            new_rot_vel = (spawn_vel.magnitude_squared() /
+                           vel.magnitude_squared()) * rot_vel
+            to_ret.append((pos, spawn_vel, new_rot_vel, new_level,
+                           shape_rng.randrange(NUM_TEMPLATES)))
+        return to_ret
+
+    @classmethod
+    def splitFrom(cls, surface, pos, vel, rot_vel, level, rng=random,
+                  shape_rng=random):
+        """Split an Asteroid with the given state into a list of smaller ones
+
+        Arguments:
+        surface -- pygame.Surface to draw the new Asteroids on
+        pos -- position of the Asteroid being split
+        vel -- velocity of the Asteroid being split
+        rot_vel -- rotational velocity of the Asteroid being split
+        level -- which level of radius the Asteroid being split is
+        rng -- random.Random to draw the split angle from
+        shape_rng -- random.Random to draw the new outline templates from
+        """
+        return [cls(surface, *params) for params in
+                cls.splitParams(pos, vel, rot_vel, level, rng, shape_rng)]
+
+
+# Outline templates of each level, shared by every Asteroid using them
+Asteroid.templates = [makeTemplates(radius, NUM_TEMPLATES,
+                                    random.Random(TEMPLATE_SEED + level))
+                      for level, radius in enumerate(Asteroid.radii)]
@@ -0,0 +1,233 @@
+import pygame
+import random
+import numpy as np
+from asteroid import Asteroid, SPIN_DT
+vec2 = pygame.math.Vector2
+
+SCREEN_WIDTH = 900
+SCREEN_HEIGHT = 700
+# Asteroid.templates as (level, shape, NUM_VERTS, 2) outlines and extents
+TEMPLATE_OUTLINES = np.array([[outline for outline, extent in level]
+                              for level in Asteroid.templates])
+TEMPLATE_EXTENTS = np.array([[extent for outline, extent in level]
+                             for level in Asteroid.templates])
+
+
+def rotate(points, degrees):
+    """Rotate 2D points about the origin the same way Vector2.rotate does
+
+    Arguments:
+    points -- array of shape (..., 2) to rotate
+    degrees -- angles broadcastable against points[..., 0], in degrees
+    """
+    rad = np.radians(degrees)
+    c, s = np.cos(rad), np.sin(rad)
+    x, y = points[..., 0], points[..., 1]
+    return np.stack((x * c - y * s, x * s + y * c), axis=-1)
+
+
+def advance(pos, prev_pos, vel, angle, rot_vel, extent, radius, reenter, dt):
+    """Move, rotate and wrap arrays of Asteroids in place like Asteroid.update
+
+    Every argument but dt is an array with the same leading shape, so one
+    call can update a single field or a batch of fields.
+
+    Arguments:
+    pos -- (..., 2) positions
+    prev_pos -- (..., 2) positions at the previous tick, set from pos
+    vel -- (..., 2) velocities
+    angle -- rotations of the outlines in degrees
+    rot_vel -- rotational velocities in degrees per SPIN_DT of dt
+    extent -- distances from pos to the farthest outline vertex
+    radius -- radii of each Asteroid's level
+    reenter -- whether each Asteroid is coming back onto the screen
+    dt -- the delta time to update with
+    """
+    prev_pos[...] = pos
+    pos += vel * dt
+    angle[...] = (angle + rot_vel * (dt / SPIN_DT)) % 360
+    size = 2 * extent
+
+    # Wrap screen, horizontally first like Asteroid.update
+    x, y = pos[..., 0], pos[..., 1]
+    left = ~reenter & (x + extent < 0)
+    right = ~reenter & ~left & (x - extent > SCREEN_WIDTH)
+    x += np.where(left, 1, np.where(right, -1, 0)) * (SCREEN_WIDTH + size)
+    reenter |= left | right
+    top = ~reenter & (y - extent < 0)
+    bottom = ~reenter & ~top & (y + extent > SCREEN_HEIGHT)
+    y += np.where(top, 1, np.where(bottom, -1, 0)) * (SCREEN_HEIGHT + size)
+    reenter |= top | bottom
+
+    wrapped = left | right | top | bottom
+    prev_pos[wrapped] = pos[wrapped]  # Don't interpolate across the screen
+
+    inside = (x + radius >= 0) & (x - radius <= SCREEN_WIDTH) & \
+        (y + radius >= 0) & (y - radius <= SCREEN_HEIGHT)
+    reenter &= inside
+
+
+class AsteroidField:
+
+    def __init__(self, surface, capacity=64):
+        """Create an AsteroidField holding every Asteroid as NumPy arrays
+
+        Arguments:
+        surface -- pygame.Surface to draw the Asteroids on
+        capacity -- number of Asteroids to allocate room for up front
+        """
+        self.surface = surface
+        self.count = 0  # Number of live Asteroids, stored in rows [0, count)
+        self.pos = np.zeros((capacity, 2))
+        self.prev_pos = np.zeros((capacity, 2))  # for interpolated drawing
+        self.vel = np.zeros((capacity, 2))
+        self.rot_vel = np.zeros(capacity)
+        self.level = np.zeros(capacity, dtype=np.int64)
+        self.radius = np.zeros(capacity)
+        self.shape = np.zeros(capacity, dtype=np.int64)  # Outline template
+        self.angle = np.zeros(capacity)  # Rotation of outline in degrees
+        self.extent = np.zeros(capacity)  # Farthest vertex from pos
+        self.reenter = np.zeros(capacity, dtype=bool)
+        self.world_verts = None  # Cached verts, cleared when state changes
+
+    def __len__(self):
+        return self.count
+
+    def add(self, ast):
+        """Add an Asteroid object to the field
+
+        Arguments:
+        ast -- Asteroid to copy state from
+        """
+        if self.count == len(self.pos):
+            self.grow(2 * len(self.pos))
+        i = self.count
+        self.pos[i] = ast.pos
+        self.prev_pos[i] = ast.prev_pos
+        self.vel[i] = ast.vel
+        self.rot_vel[i] = ast.rot_vel
+        self.level[i] = ast.level
+        self.radius[i] = ast.radius
+        self.shape[i] = ast.shape
+        self.angle[i] = ast.angle
+        self.extent[i] = ast.extent
+        self.reenter[i] = ast.reenter
+        self.count += 1
+        self.world_verts = None
+
+    def spawn(self, pos, vel, rot_vel, level, shape):
+        """Add an Asteroid to the field straight from its starting state
+
+        Takes the same arguments as Asteroid and sets the same state, but
+        only writes the next free row instead of allocating an object.
+
+        Arguments:
+        pos -- initial position of Asteroid
+        vel -- inital velocity of Asteroid
+        rot_vel -- rotational velocity of Asteroid
+        level -- which level of radius Asteroid is
+        shape -- which outline template of the level to use
+        """
+        if self.count == len(self.pos):
+            self.grow(2 * len(self.pos))
+        i = self.count
+        if vel.magnitude_squared() > Asteroid.vel_lim * Asteroid.vel_lim:
+            vel = vec2(vel)
+            vel.scale_to_length(Asteroid.vel_lim)
+        extent = TEMPLATE_EXTENTS[level, shape]
+        self.pos[i] = pos
+        self.prev_pos[i] = pos
+        self.vel[i] = vel
+        self.rot_vel[i] = max(  # Clamp rotational speed
+            min(rot_vel, Asteroid.rot_vel_lim), -Asteroid.rot_vel_lim)
+        self.level[i] = level
+        self.radius[i] = Asteroid.radii[level]
+        self.shape[i] = shape
+        self.angle[i] = 0
+        self.extent[i] = extent
+        self.reenter[i] = \
+            pos.x + extent < 0 or pos.x - extent > SCREEN_WIDTH or \
+            pos.y + extent < 0 or pos.y - extent > SCREEN_HEIGHT
+        self.count += 1
+        self.world_verts = None
+
+    def extend(self, asts):
+        """Add every Asteroid object in a list to the field"""
+        for ast in asts:
+            self.add(ast)
+
+    def grow(self, capacity):
+        """Reallocate every array with room for 'capacity' Asteroids"""
+        for name in ("pos", "prev_pos", "vel", "rot_vel", "level", "radius",
+                     "shape", "angle", "extent", "reenter"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def remove(self, indices):
+        """Remove Asteroids from the field, keeping the rest in order
+
+        Arguments:
+        indices -- rows of the Asteroids to remove
+        """
+        keep = np.ones(self.count, dtype=bool)
+        keep[indices] = False
+        n = int(keep.sum())
+        for arr in (self.pos, self.prev_pos, self.vel, self.rot_vel,
+                    self.level, self.radius, self.shape, self.angle,
+                    self.extent, self.reenter):
+            arr[:n] = arr[:self.count][keep]
+        self.count = n
+        self.world_verts = None
+
+    def clear(self):
+        """Remove every Asteroid from the field"""
+        self.count = 0
+        self.world_verts = None
+
+    @property
+    def verts(self):
+        """Screen space vertices of every Asteroid, computed once per update
+
+        Only drawing and exact collision tests need these, so they are not
+        kept up to date by update().
+        """
+        if self.world_verts is None:
+            n = self.count
+            outline = TEMPLATE_OUTLINES[self.level[:n], self.shape[:n]]
+            self.world_verts = self.pos[:n, None, :] + \
+                rotate(outline, self.angle[:n, None])
+        return self.world_verts
+
+    def split(self, i, rng=random, shape_rng=random):
+        """Split the Asteroid in row 'i', spawning the pieces after the others
+
+        The split Asteroid itself is left in the field and rows before the
+        new pieces keep their place, so remove it once done splitting.
+
+        Arguments:
+        i -- row of the Asteroid to split
+        rng -- random.Random to draw the split angle from
+        shape_rng -- random.Random to draw the new outline templates from
+
+        Returns the number of pieces spawned
+        """
+        pieces = Asteroid.splitParams(
+            vec2(*self.pos[i]), vec2(*self.vel[i]), float(self.rot_vel[i]),
+            int(self.level[i]), rng, shape_rng)
+        for params in pieces:
+            self.spawn(*params)
+        return len(pieces)
+
+    def update(self, dt):
+        """Update state of every Asteroid, matching Asteroid.update
+
+        Arguments:
+        dt -- the delta time to update with
+        """
+        n = self.count
+        advance(self.pos[:n], self.prev_pos[:n], self.vel[:n], self.angle[:n],
+                self.rot_vel[:n], self.extent[:n], self.radius[:n],
+                self.reenter[:n], dt)
+        self.world_verts = None
@@ -0,0 +1,101 @@
+import numpy as np
+from actions import ACTIONS, NUM_ACTIONS
+from observation import OBS_SIZE
+from pixels import FrameStack, PixelRenderer
+from sensors import NUM_RAYS, senseWorld
+from world import World, TICK_RATE
+
+OBS_MODES = ("nearest", "rays", "pixels")
+
+
+class AsteroidsEnv:
+
+    num_actions = NUM_ACTIONS  # Actions are indices into actions.ACTIONS
+
+    def __init__(self, max_steps=None, obs_mode="nearest", record=False,
+                 tick_rate=TICK_RATE, collisions="discrete"):
+        """Create an AsteroidsEnv for an agent to play one headless game
+
+        Arguments:
+        max_steps -- end episodes after this many ticks. None to never cut
+                     an episode short
+        obs_mode -- "nearest" for observation.observe features, "rays" for
+                    sensors.sense ray distances and speeds, "pixels" for the
+                    newest NUM_FRAMES pixels.PixelRenderer images
+        record -- keep an EpisodeLog of each episode in world.log
+        tick_rate -- Number of fixed simulation ticks per simulated second
+        collisions -- one of collision.COLLISION_MODES, "swept" keeps
+                      outcomes close to the default tick_rate at coarse ones
+                      and "hull" matches hits to the shapes drawn
+        """
+        if obs_mode not in OBS_MODES:
+            raise ValueError("unknown obs mode %r" % obs_mode)
+        self.max_steps = max_steps
+        self.obs_mode = obs_mode
+        if obs_mode == "pixels":
+            self.renderer = PixelRenderer()
+            self.frames = FrameStack(self.renderer.pixels.shape)
+            self.obs_shape = self.frames.frames().shape
+        elif obs_mode == "rays":
+            self.obs_shape = (2 * NUM_RAYS,)
+        else:
+            self.obs_shape = (OBS_SIZE,)
+        self.obs_size = int(np.prod(self.obs_shape))
+        self.world = World(tick_rate=tick_rate, record=record,
+                           collisions=collisions)
+
+    def reset(self, seed=None):
+        """Start a new episode and return its first observation
+
+        Arguments:
+        seed -- seed for the random spawns and splits, see World.reset
+        """
+        self.world.reset(seed)
+        if self.obs_mode == "pixels":
+            return self.frames.reset(self.renderer.render(self.world))
+        return self.observe()
+
+    def step(self, action, repeat=1):
+        """Play repeat ticks with the Ship controls of an action
+
+        The observation is only built after the last tick, so pixel
+        observations skip the frames in between.
+
+        Arguments:
+        action -- index into actions.ACTIONS
+        repeat -- number of ticks to hold the action for, at least 1, fewer
+                  if the episode ends first
+
+        Returns (obs, reward, done, info): the observation after the ticks,
+        Asteroids destroyed over them, whether the episode ended and a dict
+        holding the score and the ticks played
+        """
+        if repeat < 1:
+            raise ValueError("repeat must be at least 1, got %r" % repeat)
+        world = self.world
+        controls = ACTIONS[action]
+        prev_score = world.score
+        done = False
+        for ticks in range(1, repeat + 1):
+            alive = world.step(controls)
+            done = not alive or \
+                (self.max_steps is not None and world.ticks >= self.max_steps)
+            if done:
+                break
+        if self.obs_mode == "pixels":
+            self.frames.push(self.renderer.render(world))
+        return self.observe(), world.score - prev_score, done, \
+            {"score": world.score, "ticks": ticks}
+
+    def observe(self):
+        """Get the observation of the World in this env's obs_mode
+
+        Pixel observations are the frames pushed by reset() and step(),
+        as views into the frame stack that change on the next step. Copy
+        them to keep them.
+        """
+        if self.obs_mode == "pixels":
+            return self.frames.frames()
+        if self.obs_mode == "rays":
+            return senseWorld(self.world, velocity=True)
+        return self.world.observe()
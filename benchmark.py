@@ -0,0 +1,238 @@
+"""Benchmark the headless simulation and rendering of Asteroids
+
+Run `python benchmark.py` to time every scenario and save the results to
+JSON. Each scenario is timed --repeats times and its fastest run kept, as
+single runs vary far more than any regression worth catching. Pass a
+previous results file with --baseline to compare against it.
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import sys
+import time
+from collections import defaultdict
+import pygame
+from asteroid import Asteroid, AST_SPEED_MIN, NUM_TEMPLATES
+from profiler import Phase
+from ship import Ship
+from sprites import SpriteAtlas
+from world import World
+vec2 = pygame.math.Vector2
+
+SCREEN_WIDTH = 900
+SCREEN_HEIGHT = 700
+TICKS = 1200  # Ticks each scenario is timed for
+WARMUP_TICKS = 60  # Ticks run before timing, filling caches and the field
+SEED = 0
+REPEATS = 5  # Timed runs of each scenario, the fastest one is kept
+REGRESSION = 0.25  # Fraction of steps/sec a scenario may lose to a baseline
+CASCADE_ASTEROIDS = 12  # Level 3 Asteroids the split cascade keeps around
+OUTPUT_FILE = "benchmark.json"
+
+
+class PhaseTimer:
+
+    def __init__(self):
+        """Create a PhaseTimer totalling the time spent in each phase"""
+        self.totals = defaultdict(float)  # Seconds spent in each phase
+        self.counts = defaultdict(int)  # Times each phase was entered
+
+    def phase(self, name):
+        """Get a context manager timing one run of a phase"""
+        return Phase(self, name)
+
+    def add(self, name, start, end):
+        """Add one run of a phase that lasted from start to end"""
+        self.totals[name] += end - start
+        self.counts[name] += 1
+
+
+def crowd(count):
+    """Make a scenario keeping count randomly spawned Asteroids in play"""
+    def setup(world):
+        world.asteroid_spawn_count = count
+        world.spawnAsteroids()
+    return setup, lambda world: (0, False, False, False)
+
+
+def sustainedFire(world):
+    """Turn in place shooting as fast as Ship.shots_per_sec allows"""
+    return (0, True, False, True)
+
+
+def cascade(world):
+    """Keep level 3 Asteroids around the Ship for it to split apart"""
+    world.asteroid_spawn_count = 0
+    level = len(Asteroid.radii) - 1
+    rng = world.spawn_rng
+    while len(world.asteroids) < CASCADE_ASTEROIDS:
+        out = vec2(1, 0).rotate(rng.uniform(0, 360))
+        pos = world.ship.pos + out * (Asteroid.radii[level] + Ship.size)
+        # Circle the Ship slowly, splitting needs a nonzero velocity
+        vel = out.rotate(90) * AST_SPEED_MIN
+        world.asteroids.add(Asteroid(world.surface, pos, vel, 0, level,
+                                     world.shape_rng.randrange(NUM_TEMPLATES)))
+
+
+def splitCascade():
+    """Make a scenario splitting level 3 Asteroids down to nothing"""
+    def controls(world):
+        cascade(world)
+        return sustainedFire(world)
+    return cascade, controls
+
+
+SCENARIOS = {
+    "asteroids_7": crowd(7),
+    "asteroids_50": crowd(50),
+    "asteroids_200": crowd(200),
+    "asteroids_1000": crowd(1000),
+    "sustained_fire": (lambda world: None, sustainedFire),
+    "split_cascade": splitCascade(),
+}
+
+
+def run(name, ticks=TICKS, render=True):
+    """Time one scenario
+
+    Arguments:
+    name -- key of the scenario in SCENARIOS
+    ticks -- ticks to time after warming up
+    render -- also time drawing every tick to an offscreen Surface
+
+    Returns a dict of the results
+    """
+    setup, controls = SCENARIOS[name]
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    world = World(surface, seed=SEED)
+    setup(world)
+    atlas = SpriteAtlas()
+    for _ in range(WARMUP_TICKS):
+        world.step(controls(world))
+        atlas.draw(surface, world)
+
+    timer = PhaseTimer()
+    world.timer = timer
+    entities = 0
+    start = time.perf_counter()
+    for _ in range(ticks):
+        actions = controls(world)
+        with timer.phase("step"):
+            world.step(actions)
+        if render:
+            with timer.phase("render"):
+                surface.fill((0, 0, 0))
+                atlas.draw(surface, world)
+        entities += len(world.asteroids) + len(world.bullets)
+    elapsed = time.perf_counter() - start
+    world.timer = None
+
+    step_time = timer.totals.pop("step")
+    return {
+        "ticks": ticks,
+        "steps_per_sec": ticks / step_time,
+        "frames_per_sec": ticks / elapsed,
+        "mean_entities": entities / ticks,
+        "score": world.score,
+        # Microseconds per tick, split is counted inside collisions too
+        "phase_us": {phase: total / ticks * 1e6
+                     for phase, total in sorted(timer.totals.items())},
+    }
+
+
+def best(name, ticks=TICKS, render=True, repeats=REPEATS):
+    """Time a scenario several times and keep its fastest run
+
+    Every run replays the same ticks, so slower ones only measure noise
+    from the rest of the machine.
+
+    Arguments:
+    name -- key of the scenario in SCENARIOS
+    ticks -- ticks to time in each run
+    render -- also time drawing, see run()
+    repeats -- number of runs
+
+    Returns the dict of the fastest run, with the steps/sec of every run
+    """
+    runs = [run(name, ticks, render) for _ in range(repeats)]
+    result = max(runs, key=lambda result: result["steps_per_sec"])
+    result["runs_steps_per_sec"] = [timed["steps_per_sec"] for timed in runs]
+    return result
+
+
+def compare(results, baseline, threshold=REGRESSION):
+    """Print steps/sec against a baseline and return the regressed names
+
+    Arguments:
+    results -- results of this run, from main()
+    baseline -- results loaded from an earlier run
+    threshold -- fraction of steps/sec a scenario may lose before it
+                 counts as regressed
+    """
+    regressed = []
+    for name, result in results["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if old is None:
+            continue
+        ratio = result["steps_per_sec"] / old["steps_per_sec"]
+        flag = ""
+        if ratio < 1 - threshold:
+            regressed.append(name)
+            flag = "  REGRESSION"
+        print("%-16s %10.0f -> %10.0f steps/sec (%+.1f%%)%s" % (
+            name, old["steps_per_sec"], result["steps_per_sec"],
+            (ratio - 1) * 100, flag))
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenarios", nargs="*",
+                        help="scenarios to run, all of them by default: " +
+                        ", ".join(SCENARIOS))
+    parser.add_argument("--ticks", type=int, default=TICKS)
+    parser.add_argument("--repeats", type=int, default=REPEATS,
+                        help="timed runs of each scenario, the fastest is "
+                        "kept (default %(default)s)")
+    parser.add_argument("--no-render", action="store_true",
+                        help="only time the simulation")
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION,
+                        help="fraction of steps/sec a scenario may lose to "
+                        "the baseline (default %(default)s)")
+    args = parser.parse_args()
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error("unknown scenario %s" % name)
+    if args.repeats < 1:
+        parser.error("--repeats must be at least 1")
+
+    results = {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "scenarios": {},
+    }
+    for name in args.scenarios or SCENARIOS:
+        result = best(name, args.ticks, not args.no_render, args.repeats)
+        results["scenarios"][name] = result
+        phases = "  ".join("%s %.0f" % item
+                           for item in result["phase_us"].items())
+        print("%-16s %10.0f steps/sec  %8.1f entities  us/tick: %s" % (
+            name, result["steps_per_sec"], result["mean_entities"], phases))
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,12 @@ vec2 = pygame.math.Vector2
 
 SCREEN_WIDTH = 900
 SCREEN_HEIGHT = 700
+POOL_SIZE = 32  # Bullets allocated up front, more than Ship can keep alive
 
 
 class Bullet:
 
+    __slots__ = ("surface", "pos", "prev_pos", "dir", "rect")
     radius = 2
     color = (255, 255, 255)
     vel = 125
@@ -21,13 +23,32 @@ class Bullet:
         """
         self.surface = surface
         self.pos = vec2(pos)
+        self.prev_pos = vec2(pos)  # position at previous tick, for drawing
         self.dir = vec2(dir).normalize()
         self.rect = pygame.Rect(
             pos.x, pos.y, Bullet.radius * 2, Bullet.radius * 2)
 
-    def show(self):
-        """Draw Bullet to surface"""
-        int_pos = (int(self.pos.x), int(self.pos.y))
+    def reset(self, pos, dir):
+        """Reuse Bullet for a new shot without allocating anything
+
+        Arguments:
+        pos -- Initial position of Bullet
+        dir -- Direction Bullet is traveling
+        """
+        self.pos.update(pos)
+        self.prev_pos.update(pos)
+        self.dir.update(dir)
+        self.dir.normalize_ip()
+        self.rect.topleft = (pos.x, pos.y)
+
+    def show(self, alpha=1):
+        """Draw Bullet to surface
+
+        Arguments:
+        alpha -- Fraction of the way from the previous tick to draw Bullet at
+        """
+        pos = self.prev_pos.lerp(self.pos, alpha)
+        int_pos = (int(pos.x), int(pos.y))
         self.rect = pygame.draw.circle(self.surface, (255, 255, 255),
                                        int_pos, Bullet.radius)
         return self.rect
@@ -38,6 +59,7 @@ class Bullet:
         Arguments:
         dt -- Delta time to modify state calculations
         """
+        self.prev_pos.update(self.pos)
         self.pos += self.dir * Bullet.vel * dt
         self.rect.center = self.pos
         if self.pos.x + Bullet.radius < 0 or \
@@ -54,3 +76,34 @@ class Bullet:
     def getbounds(self):
         """Get bounding rectangle of Bullet"""
         return self.rect
+
+
+class BulletPool:
+
+    def __init__(self, surface, size=POOL_SIZE):
+        """Create a BulletPool of Bullets to reuse instead of allocating
+
+        Arguments:
+        surface -- pygame.Surface the Bullets draw to
+        size -- number of Bullets to allocate up front
+        """
+        self.surface = surface
+        self.free = [Bullet(surface, vec2(0, 0), vec2(1, 0))
+                     for _ in range(size)]
+
+    def acquire(self, pos, dir):
+        """Get a Bullet reset to a new shot, allocating only if none are free
+
+        Arguments:
+        pos -- Initial position of Bullet
+        dir -- Direction Bullet is traveling
+        """
+        if not self.free:
+            return Bullet(self.surface, pos, dir)
+        bullet = self.free.pop()
+        bullet.reset(pos, dir)
+        return bullet
+
+    def release(self, bullets):
+        """Return Bullets that are no longer in play to the pool"""
+        self.free.extend(bullets)
@@ -0,0 +1,230 @@
+import numpy as np
+from asteroidfield import TEMPLATE_OUTLINES, rotate
+from ship import Ship
+
+# "discrete" tests end of tick positions like the original game, "swept"
+# tests the whole path moved over each tick so large ticks cannot tunnel,
+# "polygon" also refines swept Bullet hits against Asteroid outlines and
+# "hull" tests the Ship triangle and Bullets against Asteroid convex hulls
+COLLISION_MODES = ("discrete", "swept", "polygon", "hull")
+
+
+def sweptCircles(start, end, center_start, center_end, reach):
+    """Test points moving over a tick against circles moving over it too
+
+    Both move in a straight line, so it is enough to find how close the
+    point gets to the circle's center in the circle's own frame.
+
+    Arguments:
+    start -- (P, 2) point positions at the start of the tick
+    end -- (P, 2) point positions at the end of the tick
+    center_start -- (P, 2) circle centers at the start of the tick
+    center_end -- (P, 2) circle centers at the end of the tick
+    reach -- (P,) distance within which a point hits its circle
+
+    Returns a (P,) mask of which pairs came within reach
+    """
+    rel_start = start - center_start
+    rel_move = (end - center_end) - rel_start
+    move_sq = (rel_move * rel_move).sum(-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = -(rel_start * rel_move).sum(-1) / move_sq
+    t = np.where(move_sq > 0, np.clip(t, 0, 1), 0)  # Time of closest point
+    closest = rel_start + t[:, None] * rel_move
+    return (closest * closest).sum(-1) < reach * reach
+
+
+def pointsInPolygons(points, verts):
+    """Test whether points are inside polygons by counting edge crossings
+
+    Arguments:
+    points -- (P, 2) points
+    verts -- (P, V, 2) polygon vertices in order
+
+    Returns a (P,) mask
+    """
+    x, y = points[:, None, 0], points[:, None, 1]
+    x0, y0 = verts[..., 0], verts[..., 1]
+    x1, y1 = np.roll(x0, -1, axis=1), np.roll(y0, -1, axis=1)
+    crosses = (y0 > y) != (y1 > y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cross_x = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+    return (crosses & (x < cross_x)).sum(axis=1) % 2 == 1
+
+
+def segmentsCrossPolygons(start, end, verts):
+    """Test whether segments cross any edge of polygons
+
+    Arguments:
+    start -- (P, 2) segment starts
+    end -- (P, 2) segment ends
+    verts -- (P, V, 2) polygon vertices in order
+
+    Returns a (P,) mask
+    """
+    d = (end - start)[:, None, :]
+    s = verts - start[:, None, :]
+    e = np.roll(verts, -1, axis=1) - verts
+    denom = d[..., 0] * e[..., 1] - d[..., 1] * e[..., 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        along_seg = (s[..., 0] * e[..., 1] - s[..., 1] * e[..., 0]) / denom
+        along_edge = (s[..., 0] * d[..., 1] - s[..., 1] * d[..., 0]) / denom
+    hit = (denom != 0) & (along_seg >= 0) & (along_seg <= 1) & \
+        (along_edge >= 0) & (along_edge <= 1)
+    return hit.any(axis=1)
+
+
+def sweptPolygons(start, end, center_start, center_end, outline):
+    """Test points moving over a tick against moving polygon outlines
+
+    Works in each polygon's frame like sweptCircles. The outline is held
+    at its end of tick rotation, which turns at most a few degrees a tick.
+
+    Arguments:
+    start -- (P, 2) point positions at the start of the tick
+    end -- (P, 2) point positions at the end of the tick
+    center_start -- (P, 2) polygon centers at the start of the tick
+    center_end -- (P, 2) polygon centers at the end of the tick
+    outline -- (P, V, 2) polygon vertices relative to their center
+
+    Returns a (P,) mask of which points touched their polygon
+    """
+    rel_start = start - center_start
+    rel_end = end - center_end
+    return pointsInPolygons(rel_end, outline) | \
+        segmentsCrossPolygons(rel_start, rel_end, outline)
+
+
+def convexHull(points):
+    """Get the convex hull of 2D points counterclockwise, by monotone chain
+
+    Arguments:
+    points -- (N, 2) array of points
+
+    Returns an (H, 2) array of the hull's corners
+    """
+    pts = sorted(map(tuple, points))
+
+    def half(pts):
+        chain = []
+        for p in pts:
+            while len(chain) >= 2 and \
+                    (chain[-1][0] - chain[-2][0]) * (p[1] - chain[-2][1]) - \
+                    (chain[-1][1] - chain[-2][1]) * (p[0] - chain[-2][0]) <= 0:
+                chain.pop()
+            chain.append(p)
+        return chain[:-1]
+    return np.array(half(pts) + half(pts[::-1]))
+
+
+def edgeNormals(verts):
+    """Get the unit normal of each edge of (..., V, 2) polygons"""
+    edge = np.roll(verts, -1, axis=-2) - verts
+    normal = np.stack((edge[..., 1], -edge[..., 0]), axis=-1)
+    return normal / np.linalg.norm(normal, axis=-1, keepdims=True)
+
+
+def padHulls(hulls):
+    """Stack hulls of different sizes by repeating each one's first corner
+
+    Repeated corners leave every projection, and so every test, unchanged.
+    Returns (corners, normals), the normals of the extra edges copied from
+    the first edge.
+    """
+    size = max(len(hull) for hull in hulls)
+    corners = np.array([np.concatenate((hull, hull[:1].repeat(
+        size - len(hull), axis=0))) for hull in hulls])
+    normals = np.array([np.concatenate((edgeNormals(hull), edgeNormals(
+        hull)[:1].repeat(size - len(hull), axis=0))) for hull in hulls])
+    return corners, normals
+
+
+# Convex hulls of every outline template at angle 0, as (level, shape,
+# corner, 2) arrays of corners and of the outward normal of each edge
+TEMPLATE_HULLS, TEMPLATE_HULL_NORMALS = [
+    arr.reshape(TEMPLATE_OUTLINES.shape[:2] + arr.shape[1:])
+    for arr in padHulls([convexHull(outline) for outline in
+                         TEMPLATE_OUTLINES.reshape((-1,) +
+                                                   TEMPLATE_OUTLINES.shape[2:])])]
+# Ship triangle facing (1, 0)
+SHIP_OUTLINE = np.array(Ship.outline((1, 0)))
+SHIP_NORMALS = edgeNormals(SHIP_OUTLINE)
+
+
+def headingOf(dir):
+    """Get the angles in degrees of (..., 2) direction vectors"""
+    return np.degrees(np.arctan2(dir[..., 1], dir[..., 0]))
+
+
+def separated(verts_a, verts_b, axes):
+    """Test whether any axis separates pairs of convex polygons
+
+    Arguments:
+    verts_a -- (P, A, 2) corners of the first polygon of each pair
+    verts_b -- (P, B, 2) corners of the second polygon of each pair
+    axes -- (P, K, 2) axes to project both onto
+
+    Returns a (P,) mask of the pairs that do not overlap
+    """
+    proj_a = np.einsum("pki,pvi->pkv", axes, verts_a)
+    proj_b = np.einsum("pki,pvi->pkv", axes, verts_b)
+    return ((proj_a.max(-1) < proj_b.min(-1)) |
+            (proj_b.max(-1) < proj_a.min(-1))).any(axis=-1)
+
+
+def shipHulls(ship_pos, ship_dir, ast_pos, level, shape, angle):
+    """Test Ship triangles against Asteroid hulls by separating axes
+
+    Only call this for pairs whose bounding circles already overlap.
+
+    Arguments:
+    ship_pos -- (P, 2) Ship positions
+    ship_dir -- (P, 2) unit vectors Ship is facing
+    ast_pos -- (P, 2) Asteroid positions
+    level -- (P,) Asteroid levels
+    shape -- (P,) Asteroid outline templates
+    angle -- (P,) Asteroid rotations in degrees
+
+    Returns a (P,) mask of which pairs overlap
+    """
+    heading = headingOf(ship_dir)[:, None]
+    ship = rotate(SHIP_OUTLINE, heading) + (ship_pos - ast_pos)[:, None, :]
+    hull = rotate(TEMPLATE_HULLS[level, shape], angle[:, None])
+    axes = np.concatenate((rotate(SHIP_NORMALS, heading),
+                           rotate(TEMPLATE_HULL_NORMALS[level, shape],
+                                  angle[:, None])), axis=1)
+    return ~separated(ship, hull, axes)
+
+
+def circleHulls(center, radius, ast_pos, level, shape, angle):
+    """Test circles against Asteroid hulls by separating axes
+
+    The axes are the hull's edge normals plus the one from the circle's
+    center to the hull's closest corner. Only call this for pairs whose
+    bounding circles already overlap.
+
+    Arguments:
+    center -- (P, 2) circle centers
+    radius -- radius of the circles
+    ast_pos -- (P, 2) Asteroid positions
+    level -- (P,) Asteroid levels
+    shape -- (P,) Asteroid outline templates
+    angle -- (P,) Asteroid rotations in degrees
+
+    Returns a (P,) mask of which pairs overlap
+    """
+    rel = (center - ast_pos)[:, None, :]
+    hull = rotate(TEMPLATE_HULLS[level, shape], angle[:, None])
+    to_corner = hull - rel
+    dist_sq = (to_corner * to_corner).sum(-1)
+    closest = np.take_along_axis(
+        to_corner, dist_sq.argmin(axis=1)[:, None, None], axis=1)
+    norm = np.linalg.norm(closest, axis=-1, keepdims=True)
+    closest = closest / np.where(norm > 0, norm, 1)
+    axes = np.concatenate((rotate(TEMPLATE_HULL_NORMALS[level, shape],
+                                  angle[:, None]), closest), axis=1)
+    proj_c = np.einsum("pki,pvi->pkv", axes, rel)[..., 0]
+    proj_h = np.einsum("pki,pvi->pkv", axes, hull)
+    gap = (proj_c + radius < proj_h.min(-1)) | \
+        (proj_h.max(-1) < proj_c - radius)
+    return ~gap.any(axis=-1)
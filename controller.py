@@ -1,4 +1,5 @@
 import pygame
+from actions import ACTIONS
 
 
 class Controller:
@@ -11,6 +12,13 @@ class Controller:
         """
         self.object = object  # The object to be controlled
 
+    def reset(self):
+        """Reset any state kept by the Controller
+
+        This method is intended to be overriden by child class
+        """
+        pass  # No state to reset
+
     def handle_event(self, event):
         """Handle event from pygame
 
@@ -18,6 +26,16 @@ class Controller:
         """
         pass  # Do nothing on events
 
+    def act(self, world):
+        """Set controls of object before each World tick
+
+        This method is intended to be overriden by child class
+
+        Arguments:
+        world -- World the object is in
+        """
+        pass  # Leave controls as they are
+
 
 class Player(Controller):
 
@@ -87,3 +105,25 @@ class Player(Controller):
                 if self.space:
                     self.object.shoot(False)
                     self.space = False
+
+
+class Agent(Controller):
+
+    def __init__(self, object, policy):
+        """Create an Agent Controller object driven by a policy
+
+        Arguments:
+        object -- Ship to control from Agent Controller
+        policy -- Callable mapping a World.observe() observation to an index
+                  into actions.ACTIONS
+        """
+        Controller.__init__(self, object)
+        self.policy = policy
+
+    def act(self, world):
+        """Set the Ship's controls from the policy's action for this tick
+
+        Arguments:
+        world -- World the Ship is in
+        """
+        self.object.setControls(*ACTIONS[self.policy(world.observe())])
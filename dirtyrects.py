@@ -0,0 +1,83 @@
+import pygame
+
+SCREEN_WIDTH = 900
+SCREEN_HEIGHT = 700
+FULL_FRACTION = 0.4  # Dirty fraction of the screen past which to flip it all
+
+
+def merge(rects):
+    """Merge overlapping rects until none of the results overlap
+
+    Arguments:
+    rects -- iterable of pygame.Rect
+
+    Returns a list of pygame.Rect covering every input rect
+    """
+    merged = []
+    for rect in rects:
+        hits = rect.collidelistall(merged)
+        # A union can grow into rects it did not overlap before
+        while hits:
+            rect = rect.unionall([merged[i] for i in hits])
+            for i in reversed(hits):
+                del merged[i]
+            hits = rect.collidelistall(merged)
+        merged.append(rect)
+    return merged
+
+
+class DirtyRects:
+
+    def __init__(self, size=(SCREEN_WIDTH, SCREEN_HEIGHT),
+                 full_fraction=FULL_FRACTION):
+        """Create a DirtyRects tracker of screen regions to update
+
+        Arguments:
+        size -- (width, height) of the screen
+        full_fraction -- fraction of the screen area that, once dirty, is
+                         cheaper to upload with a single full flip
+        """
+        self.bounds = pygame.Rect((0, 0), size)
+        self.full_area = full_fraction * self.bounds.width * self.bounds.height
+        self.rects = []  # Clipped, not yet merged, dirty rects
+
+    def add(self, rect):
+        """Mark a rect of the screen dirty, ignoring what is off screen"""
+        rect = self.bounds.clip(rect)
+        if rect.width and rect.height:
+            self.rects.append(rect)
+
+    def extend(self, rects):
+        """Mark every rect of an iterable dirty"""
+        for rect in rects:
+            self.add(rect)
+
+    def erase(self, surface, background, rects):
+        """Draw the background back over rects and mark them dirty
+
+        Overlapping rects are merged first so no pixel is erased twice.
+
+        Arguments:
+        surface -- pygame.Surface to erase from
+        background -- pygame.Surface the size of surface to erase with
+        rects -- iterable of pygame.Rect to erase
+        """
+        regions = merge(rect for rect in map(self.bounds.clip, rects)
+                        if rect.width and rect.height)
+        for rect in regions:
+            # Source and destination line up since background fills surface
+            surface.blit(background, rect, rect)
+        self.rects += regions
+
+    def update(self):
+        """Send the dirty regions to the display and start a new frame
+
+        Returns True if the whole screen was flipped instead
+        """
+        regions = merge(self.rects)
+        self.rects = []
+        if sum(rect.width * rect.height for rect in regions) >= self.full_area:
+            pygame.display.flip()
+            return True
+        pygame.display.update(regions)
+        return False
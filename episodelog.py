@@ -0,0 +1,88 @@
+import struct
+import zlib
+from collision import COLLISION_MODES
+
+MAGIC = b"ASTL"
+VERSION = 2
+# Magic, version, World seed, tick rate, index of the collision mode and
+# number of ticks recorded
+HEADER = struct.Struct("<4sBQHBI")
+# Bits of the byte each tick's Ship controls are packed into
+ACCEL_FORWARD = 1
+ACCEL_BACKWARD = 2
+LEFT = 4
+RIGHT = 8
+SHOOT = 16
+
+
+def packControls(accel, left, right, shoot):
+    """Pack (accel, left, right, shoot) Ship controls into one byte"""
+    return (ACCEL_FORWARD if accel > 0 else 0) | \
+        (ACCEL_BACKWARD if accel < 0 else 0) | \
+        (LEFT if left else 0) | (RIGHT if right else 0) | \
+        (SHOOT if shoot else 0)
+
+
+def unpackControls(byte):
+    """Unpack a byte from packControls into Ship.setControls arguments"""
+    accel = (1 if byte & ACCEL_FORWARD else 0) - \
+        (1 if byte & ACCEL_BACKWARD else 0)
+    return (accel, bool(byte & LEFT), bool(byte & RIGHT), bool(byte & SHOOT))
+
+
+class EpisodeLog:
+
+    def __init__(self, seed, tick_rate, collisions="discrete", inputs=b""):
+        """Create an EpisodeLog of everything needed to replay one game
+
+        A World is fully determined by its seed and the Ship controls of
+        each tick, so those are all that is kept.
+
+        Arguments:
+        seed -- seed the World was reset with
+        tick_rate -- tick rate of the World
+        collisions -- collision mode of the World
+        inputs -- packControls byte of every tick so far
+        """
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.collisions = collisions
+        self.inputs = bytearray(inputs)
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def record(self, ship):
+        """Record the controls a Ship is about to tick with"""
+        self.inputs.append(packControls(
+            (ship.acc > 0) - (ship.acc < 0), ship.left, ship.right,
+            ship.shooting))
+
+    def controls(self):
+        """Iterate over the (accel, left, right, shoot) of every tick"""
+        for byte in self.inputs:
+            yield unpackControls(byte)
+
+    def save(self, path):
+        """Write the log to a compact binary file"""
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, self.seed, self.tick_rate,
+                                   COLLISION_MODES.index(self.collisions),
+                                   len(self.inputs)))
+            file.write(zlib.compress(bytes(self.inputs), 9))
+
+    @classmethod
+    def load(cls, path):
+        """Read a log written by save()"""
+        with open(path, "rb") as file:
+            data = file.read()
+        magic, version, seed, tick_rate, mode, ticks = \
+            HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("%s is not a version %d episode log" %
+                             (path, VERSION))
+        inputs = zlib.decompress(data[HEADER.size:])
+        if len(inputs) != ticks:
+            raise ValueError("%s is truncated" % path)
+        return cls(seed, tick_rate, COLLISION_MODES[mode], inputs)
+
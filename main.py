@@ -1,91 +1,65 @@
 """Run the game Asteroids"""
 
+import sys
 import pygame
-import random
-from ship import Ship
-from asteroid import Asteroid
-from bullet import Bullet
+from world import World, NO_PHASE
 from gamestate import GameState
-vec2 = pygame.math.Vector2
+from controller import Agent
+from planner import Planner
+from textcache import TextCache
+from sprites import SpriteAtlas
+from dirtyrects import DirtyRects
+from profiler import Profiler
+from simthread import SimThread
 
 SCREEN_WIDTH = 900
 SCREEN_HEIGHT = 700
 FPS_LIM = 60
-MIN_ASTEROIDS = 7
-DIFFICULTY_INCREASE_THRESHOLD = 15
-ASTEROID_DIFFICULTY_INCREMENT = 3
 SCORE_FONT_SIZE = 20
 FONT_COLOR = (255, 255, 255)
 SCOREBOARD_POS = (10, 10)
 BESTSCORE_POS = (SCOREBOARD_POS[0], SCOREBOARD_POS[1] + SCORE_FONT_SIZE)
+PROFILER_POS = (SCOREBOARD_POS[0], BESTSCORE_POS[1] + 2 * SCORE_FONT_SIZE)
+PROFILE_CSV = "profile.csv"
+PROFILE_TRACE = "profile_trace.json"
 PAUSE_CENTER = (SCREEN_WIDTH / 2, SCREEN_HEIGHT / 3)
 TITLE_CENTER = (SCREEN_WIDTH / 2, SCREEN_HEIGHT / 3)
 TITLE_SIZE = 150
 SUBTITLE_CENTER = (TITLE_CENTER[0], TITLE_CENTER[1] + TITLE_SIZE)
 SUBTITLE_SIZE = 50
 
-pygame.init()
-pygame.font.init()
-
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Asteroids")
-background = pygame.Surface(screen.get_size())
-background = background.convert()
-scorefont = pygame.font.Font("Hyperspace Bold Italic.otf", SCORE_FONT_SIZE)
-score = 0
-maxscore = 0
-asteroid_spawn_count = MIN_ASTEROIDS
-currentscoreboard = None
+screen = None
+background = None
+text = None  # TextCache for every string drawn
+sprites = None  # SpriteAtlas every entity is drawn from
+drawn = []  # Rects entities were last drawn over
+dirty = None  # DirtyRects of the screen to update each frame
+currentscoreboard = None  # Rects the scoreboard was last drawn over
 bestscoreboard = None
-ship = None
-bullets = []
-asteroids = []
+profiler = None  # Profiler timing each frame, if profiling
+profilerboard = []  # Rects the profiler overlay was last drawn over
+world = None
+policy = None  # Policy flying the Ship instead of the keyboard, if any
+planner = False  # Whether a Planner flies the Ship instead of the keyboard
+threaded = False  # Whether the World ticks on a SimThread, see playThreaded()
+shadow = None  # World each frame is restored into and drawn from if threaded
 state = GameState.MAIN_MENU
 
 
-def checkCollisions():
-    """Handle collisions between entities"""
-    # Return true if game is still active, false if player has died
-    global asteroids, ship, bullets, score, maxscore, asteroid_spawn_count
-    to_split = []
-    for ast in asteroids:
-        # Check ship collisions
-        if ship.pos.distance_to(ast.pos) < (Ship.size / 2) + ast.radius:
-            ship.setDead(True)
-            return False
-        for bullet in bullets:
-            if bullet.pos.distance_to(ast.pos) < Bullet.radius + ast.radius:
-                to_split.append((ast, bullet))
-    for ast, bullet in to_split:
-        if bullet in bullets:
-            bullets.remove(bullet)
-        if ast in asteroids:
-            asteroids.remove(ast)
-            score += 1
-            if score % DIFFICULTY_INCREASE_THRESHOLD == 0:
-                asteroid_spawn_count += ASTEROID_DIFFICULTY_INCREMENT
-            maxscore = score if score > maxscore else maxscore
-            asteroids += ast.split()
-    return True
-
-
 def reset():
     """Reset the screen and reset entities"""
+    global world
     screen.blit(background, (0, 0))  # Erase screen
     pygame.display.update()
-    global ship, asteroids, bullets, score, asteroid_spawn_count
-    if ship:
-        ship.reset(vec2(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2))
+    if world:
+        world.reset()
     else:
-        ship = Ship(screen, vec2(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2))
-        ship.setSpawnBullet(
-            lambda pos, vel: bullets.append(Bullet(screen, pos, vel)))
-    bullets = []
-    score = 0
-    asteroids = []
-    asteroid_spawn_count = MIN_ASTEROIDS
-    for i in range(asteroid_spawn_count):
-        asteroids.append(Asteroid.genAsteroid(screen))
+        world = World(screen)
+        world.timer = profiler
+        if policy:
+            world.ship.setController(Agent(world.ship, policy))
+        elif planner:
+            world.ship.setController(Planner(world.ship))
 
 
 def mainmenu():
@@ -94,20 +68,14 @@ def mainmenu():
     # Erase screen
     screen.blit(background, (0, 0))
 
-    # Create title and subtitle font
-    title_font = pygame.font.Font("Hyperspace Bold Italic.otf", TITLE_SIZE)
-    subtitle_font = pygame.font.Font(
-        "Hyperspace Bold Italic.otf", SUBTITLE_SIZE)
-
+    # Copy cached title and subtitle since their alpha gets changed
     title_color = pygame.Color(255, 255, 255, 1)
-    title_surface = title_font.render("ASTEROIDS", False, title_color)
-    subtitle_surface = subtitle_font.render(
-        "Press any key to play", False, FONT_COLOR)
-    title_surface.convert()
-    subtitle_surface.convert()
+    title_surface = text.render("ASTEROIDS", TITLE_SIZE, title_color).copy()
+    subtitle_surface = text.render(
+        "Press any key to play", SUBTITLE_SIZE, FONT_COLOR).copy()
 
-    title_size = title_font.size("ASTEROIDS")
-    subtitle_size = subtitle_font.size("Press any key to play")
+    title_size = text.size("ASTEROIDS", TITLE_SIZE)
+    subtitle_size = text.size("Press any key to play", SUBTITLE_SIZE)
 
     title_pos = (TITLE_CENTER[0] - (title_size[0] / 2),
                  TITLE_CENTER[1] - (title_size[1] / 2))
@@ -173,13 +141,10 @@ def pause():
     """Pause the game"""
     global background, screen, state
     # Create paused screen display
-    paused_font = pygame.font.Font("Hyperspace Bold Italic.otf", 100)
-    continue_font = pygame.font.Font("Hyperspace Bold Italic.otf", 25)
-    paused_surface = paused_font.render("Paused", False, FONT_COLOR)
-    continue_surface = continue_font.render(
-        "Press P to Continue", False, FONT_COLOR)
-    p_size = paused_font.size("Paused")
-    c_size = continue_font.size("Press P to Continue")
+    paused_surface = text.render("Paused", 100, FONT_COLOR)
+    continue_surface = text.render("Press P to Continue", 25, FONT_COLOR)
+    p_size = text.size("Paused", 100)
+    c_size = text.size("Press P to Continue", 25)
     p_pos = (PAUSE_CENTER[0] - (p_size[0] / 2),
              PAUSE_CENTER[1] - (p_size[1] / 2))
     c_pos = (PAUSE_CENTER[0] - (c_size[0] / 2),
@@ -212,88 +177,209 @@ def quit():
     pygame.quit()
 
 
+def phase(name):
+    """Get a context manager timing a phase of play() if profiling"""
+    if profiler is None:
+        return NO_PHASE
+    return profiler.phase(name)
+
+
 def play():
     """Run the main game loop of Asteroids"""
-    global ship, asteroids, bullets, currentscoreboard, bestscoreboard, state
+    global state
+    if threaded:
+        return playThreaded()
+    ship = world.ship
     running = True
     clock = pygame.time.Clock()
     while running:
-        # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-                state = GameState.QUIT
-                return
-            elif event.type == pygame.KEYDOWN and event.key == pygame.K_p:
-                state = GameState.PAUSE
-                return
-            else:
-                ship.handle_event(event)
+        if profiler:
+            profiler.beginFrame()
 
-        dirty_rects = []  # For updating screen
+        # Handle events
+        with phase("events"):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                    state = GameState.QUIT
+                    return
+                elif event.type == pygame.KEYDOWN and \
+                        event.key == pygame.K_p:
+                    state = GameState.PAUSE
+                    return
+                else:
+                    ship.handle_event(event)
 
         # Erase entities froms screen
-        if currentscoreboard != None:
-            dirty_rects.append(screen.blit(
-                background, SCOREBOARD_POS, currentscoreboard.get_rect()))
-        if bestscoreboard != None:
-            dirty_rects.append(screen.blit(
-                background, BESTSCORE_POS, bestscoreboard.get_rect()))
-
-        dirty_rects.append(screen.blit(
-            background, ship.getupperleft(), ship.getbounds()))
-        for bullet in bullets:
-            dirty_rects.append(screen.blit(
-                background, bullet.getupperleft(), bullet.getbounds()))
-        for ast in asteroids:
-            dirty_rects.append(screen.blit(
-                background, ast.getupperleft(), ast.getbounds()))
+        with phase("erase"):
+            erase()
 
         # Update entities
-        dt = clock.tick(FPS_LIM)
-        speed = 1 / float(dt)
-        ship.update(speed)
-        for ast in asteroids:
-            ast.update(speed)
-        for i in range(len(bullets)-1, -1, -1):
-            if bullets[i].update(speed):
-                bullets.remove(bullets[i])
-
-        if running:  # running may be set to false in quit event
-            running = checkCollisions()
-
-        # Spawn more Asteroids if too few exist
-        if len(asteroids) < asteroid_spawn_count:
-            for i in range(asteroid_spawn_count - len(asteroids)):
-                asteroids.append(Asteroid.genAsteroid(screen))
-
-        # Show entities
-        dirty_rects.append(ship.show())
-        for ast in asteroids:
-            dirty_rects.append(ast.show())
-        for bullet in bullets:
-            dirty_rects.append(bullet.show())
-
-        currentscoreboard = scorefont.render(
-            f"Score: {score}", False, FONT_COLOR)
-        bestscoreboard = scorefont.render(
-            f"Best: {maxscore}", False, FONT_COLOR)
-        dirty_rects.append(screen.blit(currentscoreboard, SCOREBOARD_POS))
-        dirty_rects.append(screen.blit(bestscoreboard, BESTSCORE_POS))
+        with phase("wait"):
+            frame_time = clock.tick(FPS_LIM) / 1000.0
+        with phase("update"):
+            running = world.advance(frame_time)
+
+        # Show entities, interpolated between the last two ticks
+        with phase("draw"):
+            draw(world, world.alpha)
+
+        with phase("display"):
+            dirty.update()
+        if profiler:
+            profiler.endFrame(world)
+    return False
 
-        pygame.display.update(dirty_rects)
+
+def playThreaded():
+    """Run the game loop with the World ticking on a SimThread
+
+    Frames are drawn from the SimThread's newest snapshot, restored into
+    shadow, so slow frames never hold up the simulation.
+    """
+    global shadow
+    if shadow is None or shadow.tick_rate != world.tick_rate:
+        shadow = World(screen, tick_rate=world.tick_rate)
+    # Profiler is not thread safe, so frames only time the render side
+    world.timer = None
+    sim = SimThread(world)
+    sim.start()
+    try:
+        renderFrames(sim)
+    finally:
+        sim.stop()
+        world.timer = profiler
     return False
 
 
-while True:
-    if state is GameState.MAIN_MENU:
-        mainmenu()
-    elif state is GameState.PLAY:
-        if ship == None or ship.isDead():
-            reset()
-        play()
-    elif state is GameState.PAUSE:
-        pause()
-    elif state is GameState.QUIT:
-        quit()
-        break
+def renderFrames(sim):
+    """Draw frames from a running SimThread until the game is left or over
+
+    Arguments:
+    sim -- SimThread ticking world
+    """
+    global state
+    running = True
+    clock = pygame.time.Clock()
+    while running:
+        if profiler:
+            profiler.beginFrame()
+
+        # Handle events, the Ship handles them on the SimThread
+        with phase("events"):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    state = GameState.QUIT
+                    return
+                elif event.type == pygame.KEYDOWN and \
+                        event.key == pygame.K_p:
+                    state = GameState.PAUSE
+                    return
+                else:
+                    sim.post(event)
+
+        with phase("erase"):
+            erase()
+
+        with phase("wait"):
+            clock.tick(FPS_LIM)
+        with phase("restore"):
+            running = sim.alive
+            alpha = sim.restoreDrawn(shadow)
+
+        # Show entities, interpolated between the snapshot's two ticks
+        with phase("draw"):
+            draw(shadow, alpha)
+
+        with phase("display"):
+            dirty.update()
+        if profiler:
+            profiler.endFrame(shadow)
+
+
+def erase():
+    """Erase everything the last frame drew from the screen"""
+    rects = list(drawn) + profilerboard
+    if currentscoreboard != None:
+        rects += [currentscoreboard, bestscoreboard]
+    dirty.erase(screen, background, rects)
+
+
+def draw(source, alpha):
+    """Draw the entities, scoreboards and profiler overlay of a frame
+
+    Arguments:
+    source -- World to draw the entities and scores of
+    alpha -- Fraction of the way from the previous tick to draw entities at
+    """
+    global currentscoreboard, bestscoreboard, profilerboard, drawn
+    drawn = sprites.draw(screen, source, alpha)
+    dirty.extend(drawn)
+
+    currentscoreboard = text.drawNumber(
+        screen, SCOREBOARD_POS, "Score: ", source.score,
+        SCORE_FONT_SIZE, FONT_COLOR)
+    bestscoreboard = text.drawNumber(
+        screen, BESTSCORE_POS, "Best: ", source.maxscore,
+        SCORE_FONT_SIZE, FONT_COLOR)
+    dirty.add(currentscoreboard)
+    dirty.add(bestscoreboard)
+    if profiler:
+        profilerboard = profiler.draw(screen, text, PROFILER_POS)
+        dirty.extend(profilerboard)
+
+
+def main(agent_policy=None, profile=False, use_planner=False,
+         use_thread=False):
+    """Open the game window and run the game state machine
+
+    Arguments:
+    agent_policy -- Callable mapping World.observe() observations to
+                    actions.ACTIONS indices to fly the Ship. None to play
+                    with the keyboard
+    profile -- time every phase of each frame, show the timings over the
+               game and save them to PROFILE_CSV and PROFILE_TRACE on quit
+    use_planner -- let a planner.Planner fly the Ship when there is no
+                   agent_policy
+    use_thread -- tick the World at its tick rate on a SimThread and draw
+                  frames at FPS_LIM from its snapshots
+    """
+    global screen, background, text, sprites, dirty, policy, planner, \
+        threaded, profiler
+    policy = agent_policy
+    planner = use_planner
+    threaded = use_thread
+    profiler = Profiler() if profile else None
+    pygame.init()
+    pygame.font.init()
+
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Asteroids")
+    background = pygame.Surface(screen.get_size())
+    background = background.convert()
+    text = TextCache()
+    sprites = SpriteAtlas()
+    sprites.prerender()  # Never rasterize in the middle of a game
+    dirty = DirtyRects(screen.get_size())
+
+    while True:
+        if state is GameState.MAIN_MENU:
+            mainmenu()
+        elif state is GameState.PLAY:
+            if world == None or world.ship.isDead():
+                reset()
+            play()
+        elif state is GameState.PAUSE:
+            pause()
+        elif state is GameState.QUIT:
+            quit()
+            if profiler:
+                profiler.saveCSV(PROFILE_CSV)
+                profiler.saveTrace(PROFILE_TRACE)
+            break
+
+
+if __name__ == "__main__":
+    main(profile="--profile" in sys.argv[1:],
+         use_planner="--planner" in sys.argv[1:],
+         use_thread="--threaded" in sys.argv[1:])
@@ -0,0 +1,73 @@
+import numpy as np
+from ship import Ship
+from asteroid import Asteroid
+
+SCREEN_WIDTH = 900
+SCREEN_HEIGHT = 700
+NEAREST_ASTEROIDS = 8  # Asteroids described in each observation
+SHIP_FEATURES = 6  # velocity along and across dir, position, dir
+ASTEROID_FEATURES = 6  # offset, relative velocity, radius, present flag
+OBS_SIZE = SHIP_FEATURES + NEAREST_ASTEROIDS * ASTEROID_FEATURES
+
+
+def observe(ship_pos, ship_vel, ship_dir, ast_pos, ast_vel, ast_radius,
+            ast_alive):
+    """Build flat observations of a batch of games from the Ship's view
+
+    Asteroid offsets and velocities are given along and across the Ship's
+    dir, nearest surface first, and every feature is scaled to about [-1, 1].
+
+    Arguments:
+    ship_pos -- (B, 2) Ship positions
+    ship_vel -- (B, 2) Ship velocities
+    ship_dir -- (B, 2) unit vectors Ship is facing
+    ast_pos -- (B, M, 2) Asteroid positions
+    ast_vel -- (B, M, 2) Asteroid velocities
+    ast_radius -- (B, M) Asteroid radii
+    ast_alive -- (B, M) mask of which Asteroid slots are in use
+
+    Returns a (B, OBS_SIZE) float32 array
+    """
+    batch, slots = ast_alive.shape
+    if slots < NEAREST_ASTEROIDS:  # Pad with empty slots
+        pad = NEAREST_ASTEROIDS - slots
+        ast_pos = np.pad(ast_pos, ((0, 0), (0, pad), (0, 0)))
+        ast_vel = np.pad(ast_vel, ((0, 0), (0, pad), (0, 0)))
+        ast_radius = np.pad(ast_radius, ((0, 0), (0, pad)))
+        ast_alive = np.pad(ast_alive, ((0, 0), (0, pad)))
+        slots = NEAREST_ASTEROIDS
+
+    offset = ast_pos - ship_pos[:, None, :]
+    dist = np.where(ast_alive, np.hypot(offset[..., 0], offset[..., 1]) -
+                    ast_radius, np.inf)
+    if slots > NEAREST_ASTEROIDS:
+        near = np.argpartition(dist, NEAREST_ASTEROIDS - 1, axis=1)
+        near = near[:, :NEAREST_ASTEROIDS]
+    else:
+        near = np.broadcast_to(np.arange(slots), (batch, slots))
+    near = np.take_along_axis(
+        near, np.argsort(np.take_along_axis(dist, near, axis=1), axis=1), axis=1)
+
+    rows = np.arange(batch)[:, None]
+    present = ast_alive[rows, near]
+    fwd = ship_dir[:, None, :]
+    side = np.stack((-ship_dir[:, 1], ship_dir[:, 0]), axis=-1)[:, None, :]
+    rel_pos = offset[rows, near]
+    rel_vel = ast_vel[rows, near] - ship_vel[:, None, :]
+
+    obs = np.zeros((batch, OBS_SIZE), dtype=np.float32)
+    obs[:, 0] = (ship_vel * ship_dir).sum(-1) / Ship.vel_lim
+    obs[:, 1] = (ship_vel * side[:, 0]).sum(-1) / Ship.vel_lim
+    obs[:, 2] = ship_pos[:, 0] / SCREEN_WIDTH * 2 - 1
+    obs[:, 3] = ship_pos[:, 1] / SCREEN_HEIGHT * 2 - 1
+    obs[:, 4:6] = ship_dir
+    asts = obs[:, SHIP_FEATURES:].reshape(
+        batch, NEAREST_ASTEROIDS, ASTEROID_FEATURES)
+    asts[..., 0] = (rel_pos * fwd).sum(-1) / SCREEN_WIDTH
+    asts[..., 1] = (rel_pos * side).sum(-1) / SCREEN_WIDTH
+    asts[..., 2] = (rel_vel * fwd).sum(-1) / Asteroid.vel_lim
+    asts[..., 3] = (rel_vel * side).sum(-1) / Asteroid.vel_lim
+    asts[..., 4] = ast_radius[rows, near] / Asteroid.radii[-1]
+    asts[..., 5] = 1
+    asts[~present] = 0
+    return obs
@@ -0,0 +1,92 @@
+import numpy as np
+import pygame
+from ship import Ship
+
+SCREEN_WIDTH = 900
+SCREEN_HEIGHT = 700
+PIXEL_WIDTH = 90  # Size of pixel observations, a tenth of the screen
+PIXEL_HEIGHT = 70
+NUM_FRAMES = 4  # Frames stacked into each observation
+SHIP_SHADE = 255  # Gray level each entity is drawn in
+ASTEROID_SHADE = 128
+BULLET_SHADE = 255
+
+
+class PixelRenderer:
+
+    def __init__(self, width=PIXEL_WIDTH, height=PIXEL_HEIGHT):
+        """Create a PixelRenderer drawing Worlds to a small grayscale image
+
+        Entities are drawn scaled down straight from their shapes onto an
+        offscreen 8 bit Surface, never the full size screen, and read back
+        through a NumPy view of its pixels.
+
+        Arguments:
+        width -- width of the image in pixels
+        height -- height of the image in pixels
+        """
+        self.surface = pygame.Surface((width, height), 0, 8)
+        self.surface.set_palette([(i, i, i) for i in range(256)])
+        self.scale = np.array([width / SCREEN_WIDTH, height / SCREEN_HEIGHT])
+        # surfarray indexes (x, y), transpose to (height, width) rows
+        self.pixels = pygame.surfarray.pixels2d(self.surface).T
+
+    def render(self, world):
+        """Draw a World and return a (height, width) uint8 view of it
+
+        The view is redrawn in place by the next call.
+        """
+        surface = self.surface
+        surface.fill(0)
+        field = world.asteroids
+        for verts in (field.verts * self.scale).tolist():
+            pygame.draw.polygon(surface, ASTEROID_SHADE, verts)
+
+        ship = world.ship
+        verts = np.array([ship.pos + vec for vec in Ship.outline(ship.dir)]) * \
+            self.scale
+        pygame.draw.polygon(surface, SHIP_SHADE, verts.tolist())
+
+        if world.bullets:
+            pos = np.array([bullet.pos for bullet in world.bullets])
+            for x, y in (pos * self.scale).astype(np.int64).tolist():
+                surface.set_at((x, y), BULLET_SHADE)
+        return self.pixels
+
+
+class FrameStack:
+
+    def __init__(self, shape, num_frames=NUM_FRAMES, dtype=np.uint8):
+        """Create a FrameStack keeping the newest frames in one array
+
+        Every frame is written to two slots of a 2 * num_frames ring, i and
+        i + num_frames, so the newest num_frames are always a contiguous
+        slice. Observations are views of that slice and never copied, so
+        they change once more frames are pushed. Copy them to keep them.
+
+        Arguments:
+        shape -- shape of each frame
+        num_frames -- frames in each observation
+        dtype -- dtype of the frames
+        """
+        self.num_frames = num_frames
+        self.ring = np.zeros((2 * num_frames,) + tuple(shape), dtype=dtype)
+        self.slot = 0  # Ring slot of the newest frame
+
+    def reset(self, frame):
+        """Fill the stack with one frame and return the observation"""
+        self.ring[:] = frame
+        self.slot = self.num_frames - 1
+        return self.frames()
+
+    def push(self, frame):
+        """Add the newest frame and return the observation"""
+        self.slot = (self.slot + 1) % self.num_frames
+        self.ring[self.slot] = frame
+        self.ring[self.slot + self.num_frames] = frame
+        return self.frames()
+
+    def frames(self):
+        """Get a (num_frames, ...) view of the newest frames, oldest first"""
+        start = self.slot + 1
+        return self.ring[start:start + self.num_frames]
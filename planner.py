@@ -0,0 +1,101 @@
+import numpy as np
+from actions import ACTIONS, NUM_ACTIONS
+from controller import Controller
+from vecenv import VectorEnv
+
+STRIDE = 4  # World ticks each planning tick covers
+HORIZON = 8  # Planning ticks each candidate is rolled out for
+REPLAN = 2  # Planning ticks of the best candidate followed before replanning
+# Actions each candidate can switch to halfway through its horizon
+FOLLOW_UPS = [ACTIONS.index(controls) for controls in
+              ((0, False, False, True), (1, True, False, True),
+               (1, False, True, True))]
+DEATH_PENALTY = 100  # Value lost for dying at the start of the horizon
+CLEARANCE_WEIGHT = 0.01  # Value of each pixel between Ship and Asteroids
+MAX_CLEARANCE = 200  # Clearance beyond which the Ship counts as safe
+MAX_ASTEROIDS = 32  # Asteroids nearest the Ship that rollouts keep
+
+
+class Planner(Controller):
+
+    def __init__(self, object, stride=STRIDE, horizon=HORIZON, replan=REPLAN,
+                 seed=None):
+        """Create a Planner Controller object searching ahead for actions
+
+        Every candidate holds one of the ACTIONS for the first half of the
+        horizon and one of FOLLOW_UPS for the rest. All of them are rolled
+        out at once as the games of a VectorEnv loaded with the World, and
+        the Ship follows the one that scores most without dying.
+
+        Arguments:
+        object -- Ship to control from Planner Controller
+        stride -- World ticks each planning tick covers. Rollouts tick at
+                  the World's tick_rate / stride with swept collisions, so
+                  they stay close to the World at a fraction of the cost
+        horizon -- planning ticks each candidate is rolled out for
+        replan -- planning ticks of the best candidate followed before
+                  searching again
+        seed -- seed for the splits drawn in rollouts
+        """
+        Controller.__init__(self, object)
+        self.stride = stride
+        self.horizon = horizon
+        self.replan = replan
+        self.seed = seed
+        first = np.repeat(np.arange(NUM_ACTIONS), len(FOLLOW_UPS))
+        then = np.tile(FOLLOW_UPS, NUM_ACTIONS)
+        half = (horizon + 1) // 2
+        self.candidates = np.concatenate(
+            (np.repeat(first[:, None], half, axis=1),
+             np.repeat(then[:, None], horizon - half, axis=1)), axis=1)
+        self.env = None  # VectorEnv of the rollouts, made for the first World
+        self.plan = []  # Actions left to play, one per World tick
+
+    def reset(self):
+        """Forget the current plan"""
+        self.plan = []
+
+    def act(self, world):
+        """Set the Ship's controls from the plan, searching for a new one
+        whenever it runs out
+
+        Arguments:
+        world -- World the Ship is in
+        """
+        if not self.plan:
+            best = self.search(world)
+            self.plan = np.repeat(best[:self.replan], self.stride).tolist()
+        self.object.setControls(*ACTIONS[self.plan.pop(0)])
+
+    def search(self, world):
+        """Roll out every candidate from the World's state
+
+        Arguments:
+        world -- World to plan in
+
+        Returns the planning tick actions of the best candidate
+        """
+        if self.env is None:
+            self.env = VectorEnv(len(self.candidates), seed=self.seed,
+                                 tick_rate=world.tick_rate / self.stride,
+                                 collisions="swept",
+                                 max_asteroids=MAX_ASTEROIDS)
+        env = self.env
+        env.load(world)
+        env.asteroid_spawn_count[:] = 0  # Same field for every candidate
+        value = np.zeros(len(self.candidates))
+        dead = np.zeros(len(self.candidates), dtype=bool)
+        for t in range(self.horizon):
+            reward, done = env.tick(self.candidates[:, t])
+            value += np.where(dead, 0, reward)
+            # Dying sooner leaves less time to react, so it costs more
+            died = done & ~dead
+            value[died] -= DEATH_PENALTY * (2 - t / self.horizon)
+            dead |= done
+
+        # Break ties by how far the Ship ends up from any Asteroid
+        off = env.ast_pos - env.ship_pos[:, None, :]
+        gap = np.hypot(off[..., 0], off[..., 1]) - env.ast_radius
+        gap = np.where(env.ast_alive, gap, MAX_CLEARANCE).min(axis=1)
+        value += CLEARANCE_WEIGHT * np.minimum(gap, MAX_CLEARANCE)
+        return self.candidates[np.argmax(value)]
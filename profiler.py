@@ -0,0 +1,191 @@
+import csv
+import json
+import sys
+import time
+import numpy as np
+
+WINDOW = 600  # Frames the rolling percentiles and means are taken over
+MAX_FRAMES = 18000  # Frames kept for saving, the oldest are overwritten
+MAX_PHASES = 32  # Distinct phase names a Profiler can record
+MAX_EVENTS = 20 * MAX_FRAMES  # Phase runs kept for the trace
+HUD_FONT_SIZE = 14
+HUD_COLOR = (0, 255, 0)
+PERCENTILES = (50, 95, 99)
+COUNTS = ("asteroids", "bullets", "blocks", "new_blocks")  # Per frame counts
+
+
+class Phase:
+
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer, name):
+        """Create a Phase context passing its start and end to timer.add
+
+        Arguments:
+        timer -- object with an add(name, start, end) method, like a
+                 Profiler or benchmark.PhaseTimer
+        name -- name of the phase
+        """
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.timer.add(self.name, self.start, time.perf_counter())
+
+
+class Profiler:
+
+    def __init__(self, window=WINDOW, max_frames=MAX_FRAMES,
+                 max_events=MAX_EVENTS):
+        """Create a Profiler of where the time of each frame goes
+
+        Phases are timed with phase() between beginFrame() and endFrame().
+        A World whose timer is the Profiler adds its own step() phases,
+        nested inside whichever phase advanced it.
+
+        Everything is recorded into arrays allocated up front, used as
+        rings, so profiling adds nothing to the allocation counts it shows.
+
+        Arguments:
+        window -- frames the rolling percentiles and means are taken over
+        max_frames -- frames kept for saveCSV()
+        max_events -- phase runs kept for saveTrace()
+        """
+        self.window = window
+        self.epoch = time.perf_counter()  # Trace timestamps start here
+        self.columns = {}  # Column of each phase name in phase_seconds
+        self.names = []  # Phase names by column
+        self.frames = 0  # Frames ended so far
+        self.frame_start = 0
+        self.frame_seconds = np.zeros(max_frames)
+        self.phase_seconds = np.zeros((max_frames, MAX_PHASES))
+        self.counts = np.zeros((max_frames, len(COUNTS)), dtype=np.int64)
+        self.events = 0  # Phase runs recorded so far, frames included
+        self.event_phase = np.zeros(max_events, dtype=np.int64)  # -1 frame
+        self.event_start = np.zeros(max_events)
+        self.event_seconds = np.zeros(max_events)
+        self.blocks = sys.getallocatedblocks()
+
+    def phase(self, name):
+        """Get a context manager timing one run of a phase"""
+        return Phase(self, name)
+
+    def add(self, name, start, end):
+        """Add one run of a phase that lasted from start to end"""
+        column = self.columns.get(name)
+        if column is None:
+            column = self.columns[name] = len(self.names)
+            self.names.append(name)
+        self.phase_seconds[self.frames % len(self.frame_seconds),
+                           column] += end - start
+        self.addEvent(column, start, end - start)
+
+    def addEvent(self, column, start, seconds):
+        """Record one phase run, or frame if column is -1, for the trace"""
+        i = self.events % len(self.event_start)
+        self.event_phase[i] = column
+        self.event_start[i] = start
+        self.event_seconds[i] = seconds
+        self.events += 1
+
+    def beginFrame(self):
+        """Start timing a frame"""
+        self.frame_start = time.perf_counter()
+        self.phase_seconds[self.frames % len(self.frame_seconds)] = 0
+
+    def endFrame(self, world):
+        """Finish timing a frame and record the World's entity counts"""
+        end = time.perf_counter()
+        row = self.frames % len(self.frame_seconds)
+        self.frame_seconds[row] = end - self.frame_start
+        blocks = sys.getallocatedblocks()
+        self.counts[row] = (len(world.asteroids), len(world.bullets), blocks,
+                            blocks - self.blocks)
+        self.blocks = blocks
+        self.addEvent(-1, self.frame_start, end - self.frame_start)
+        self.frames += 1
+
+    def recent(self, count):
+        """Get the rows of the last count frames, oldest first"""
+        size = len(self.frame_seconds)
+        count = min(count, self.frames, size)
+        return np.arange(self.frames - count, self.frames) % size
+
+    def percentiles(self):
+        """Get the PERCENTILES of recent frame times in milliseconds"""
+        if not self.frames:
+            return [0] * len(PERCENTILES)
+        return np.percentile(self.frame_seconds[self.recent(self.window)] *
+                             1e3, PERCENTILES)
+
+    def means(self):
+        """Get the mean milliseconds of each phase over recent frames
+
+        Phases that did not run in a frame count as 0 for it.
+        """
+        if not self.frames:
+            return {}
+        means = self.phase_seconds[self.recent(self.window)].mean(axis=0)
+        return {name: means[column] * 1e3
+                for column, name in enumerate(self.names)}
+
+    def draw(self, surface, text, pos):
+        """Draw the profiler overlay from cached glyphs
+
+        Times are drawn in microseconds so only digit glyphs are needed.
+
+        Arguments:
+        surface -- pygame.Surface to draw to
+        text -- TextCache to draw with
+        pos -- upper left corner of the overlay
+
+        Returns the list of rects drawn over
+        """
+        lines = [("Frame p%d us: " % p, ms * 1e3)
+                 for p, ms in zip(PERCENTILES, self.percentiles())]
+        lines += [(name.capitalize() + " us: ", ms * 1e3)
+                  for name, ms in sorted(self.means().items())]
+        counts = self.counts[self.recent(1)[0]] if self.frames else \
+            [0] * len(COUNTS)
+        lines += [("Asteroids: ", counts[0]), ("Bullets: ", counts[1]),
+                  ("Blocks: ", counts[2]), ("New blocks: ", counts[3])]
+        x, y = pos
+        rects = []
+        for label, number in lines:
+            rects.append(text.drawNumber(surface, (x, y), label,
+                                         int(round(number)), HUD_FONT_SIZE,
+                                         HUD_COLOR))
+            y += HUD_FONT_SIZE
+        return rects
+
+    def saveCSV(self, path):
+        """Write the measurements of every kept frame to a CSV file"""
+        rows = self.recent(len(self.frame_seconds))
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["frame", "frame_ms"] +
+                            [name + "_ms" for name in self.names] +
+                            list(COUNTS))
+            first = self.frames - len(rows)
+            for frame, row in enumerate(rows, first):
+                writer.writerow(
+                    [frame, self.frame_seconds[row] * 1e3] +
+                    (self.phase_seconds[row, :len(self.names)] *
+                     1e3).tolist() + self.counts[row].tolist())
+
+    def saveTrace(self, path):
+        """Write every kept phase run as a Chrome trace, see chrome://tracing"""
+        size = len(self.event_start)
+        count = min(self.events, size)
+        events = [{"name": self.names[column] if column >= 0 else "frame",
+                   "ph": "X", "pid": 0, "tid": 0,
+                   "ts": (start - self.epoch) * 1e6, "dur": seconds * 1e6}
+                  for column, start, seconds in zip(
+                      self.event_phase[:count].tolist(),
+                      self.event_start[:count].tolist(),
+                      self.event_seconds[:count].tolist())]
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
@@ -0,0 +1,192 @@
+import json
+import os
+import numpy as np
+from observation import OBS_SIZE
+
+ALPHA = 0.6  # How strongly priorities skew sampling, 0 for uniform
+BETA = 0.4  # How much importance weights undo the skew, 1 for fully
+PRIORITY_EPS = 1e-6  # Keeps zero error transitions sampleable
+META_FILE = "meta.json"
+
+
+class SumTree:
+
+    def __init__(self, tree):
+        """Create a SumTree over an array of 2 * leaves node sums
+
+        Node 1 is the root, node i has children 2i and 2i + 1 and leaf j is
+        node leaves + j. Node 0 is unused.
+
+        Arguments:
+        tree -- float64 array, or memmap, of length 2 * leaves with leaves a
+                power of two
+        """
+        self.tree = tree
+        self.leaves = len(tree) // 2
+        self.depth = self.leaves.bit_length() - 1
+
+    @staticmethod
+    def size(capacity):
+        """Get the tree length needed to hold capacity leaves"""
+        return 2 * (1 << max(capacity - 1, 0).bit_length())
+
+    def total(self):
+        """Get the sum of every leaf"""
+        return self.tree[1]
+
+    def get(self, leaves):
+        """Get the values of an array of leaves"""
+        return self.tree[leaves + self.leaves]
+
+    def set(self, leaves, values):
+        """Set the values of an array of leaves and update their ancestors"""
+        nodes = np.asarray(leaves) + self.leaves
+        self.tree[nodes] = values
+        for _ in range(self.depth):
+            nodes = np.unique(nodes // 2)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def find(self, prefix):
+        """Find the leaves where running sums of the leaves pass prefix
+
+        Arguments:
+        prefix -- array of values in [0, total())
+
+        Returns an array of leaf indices
+        """
+        prefix = np.array(prefix, dtype=np.float64)
+        nodes = np.ones(len(prefix), dtype=np.int64)
+        for _ in range(self.depth):
+            left = 2 * nodes
+            left_sum = self.tree[left]
+            # Rounding can leave prefix past the last nonzero leaf
+            right = (prefix >= left_sum) & (self.tree[left + 1] > 0)
+            prefix = np.where(right, prefix - left_sum, prefix)
+            nodes = np.where(right, left + 1, left)
+        return nodes - self.leaves
+
+
+class ReplayBuffer:
+
+    def __init__(self, path, capacity=None, obs_size=OBS_SIZE, alpha=ALPHA):
+        """Create or reopen a prioritized ReplayBuffer stored on disk
+
+        Every column is a numpy memmap of a .npy file in path, so only the
+        pages a minibatch touches are read into RAM. Opening a directory
+        that already holds a buffer reuses its transitions and priorities
+        as they were at the last flush().
+
+        Arguments:
+        path -- directory holding the buffer's files
+        capacity -- transitions kept before overwriting the oldest. Only
+                    needed when creating a new buffer
+        obs_size -- length of each observation
+        alpha -- how strongly priorities skew sampling, 0 for uniform
+        """
+        self.path = path
+        meta_path = os.path.join(path, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path) as file:
+                meta = json.load(file)
+            mode = "r+"
+        else:
+            if capacity is None:
+                raise ValueError("%s holds no buffer, capacity is needed" %
+                                 path)
+            os.makedirs(path, exist_ok=True)
+            meta = {"capacity": capacity, "obs_size": obs_size,
+                    "alpha": alpha, "count": 0, "head": 0,
+                    "max_priority": 1.0}
+            mode = "w+"
+        self.capacity = meta["capacity"]
+        self.obs_size = meta["obs_size"]
+        self.alpha = meta["alpha"]
+        self.count = meta["count"]  # Transitions stored so far
+        self.head = meta["head"]  # Row the next transition is written to
+        self.max_priority = meta["max_priority"]  # New transitions get this
+
+        columns = [("obs", (self.capacity, self.obs_size), np.float32),
+                   ("action", (self.capacity,), np.int64),
+                   ("reward", (self.capacity,), np.float32),
+                   ("next_obs", (self.capacity, self.obs_size), np.float32),
+                   ("done", (self.capacity,), np.bool_),
+                   ("priority", (SumTree.size(self.capacity),), np.float64)]
+        self.columns = {}
+        for name, shape, dtype in columns:
+            self.columns[name] = np.lib.format.open_memmap(
+                os.path.join(path, name + ".npy"), mode=mode, dtype=dtype,
+                shape=shape if mode == "w+" else None)
+        self.tree = SumTree(self.columns["priority"])
+        if mode == "w+":
+            self.flush()
+
+    def __len__(self):
+        return self.count
+
+    def add(self, obs, action, reward, next_obs, done):
+        """Add a batch of transitions at the highest priority seen so far
+
+        Arguments:
+        obs -- (B, obs_size) observations acted on
+        action -- (B,) actions taken
+        reward -- (B,) rewards received
+        next_obs -- (B, obs_size) observations after each action
+        done -- (B,) whether each action ended its episode
+        """
+        num = len(action)
+        rows = (self.head + np.arange(num)) % self.capacity
+        for name, values in (("obs", obs), ("action", action),
+                             ("reward", reward), ("next_obs", next_obs),
+                             ("done", done)):
+            self.columns[name][rows] = values
+        self.tree.set(rows, self.max_priority)
+        self.head = int((self.head + num) % self.capacity)
+        self.count = min(self.count + num, self.capacity)
+
+    def sample(self, batch_size, beta=BETA, rng=np.random):
+        """Sample a minibatch in proportion to priority
+
+        The total priority is split into batch_size equal strata with one
+        transition drawn from each, which also returns rows in file order.
+
+        Arguments:
+        batch_size -- number of transitions to sample
+        beta -- how much the importance weights undo the skew, 1 for fully
+        rng -- numpy random generator or module to draw from
+
+        Returns (rows, batch, weights): the rows sampled, a dict of each
+        column gathered at those rows and importance weights scaled so the
+        largest is 1
+        """
+        if self.count == 0:
+            raise ValueError("cannot sample from an empty ReplayBuffer")
+        total = self.tree.total()
+        prefix = (np.arange(batch_size) + rng.random(batch_size)) * \
+            (total / batch_size)
+        rows = np.minimum(self.tree.find(prefix), self.count - 1)
+        batch = {name: self.columns[name][rows] for name in
+                 ("obs", "action", "reward", "next_obs", "done")}
+        prob = self.tree.get(rows) / total
+        weights = (self.count * prob) ** -beta
+        return rows, batch, (weights / weights.max()).astype(np.float32)
+
+    def updatePriorities(self, rows, errors):
+        """Set the priorities of sampled rows from their new TD errors
+
+        Arguments:
+        rows -- rows returned by sample()
+        errors -- TD error of each row
+        """
+        priority = (np.abs(errors) + PRIORITY_EPS) ** self.alpha
+        self.tree.set(rows, priority)
+        self.max_priority = max(self.max_priority, float(priority.max()))
+
+    def flush(self):
+        """Write every column and the buffer's position to disk"""
+        for column in self.columns.values():
+            column.flush()
+        meta = {"capacity": self.capacity, "obs_size": self.obs_size,
+                "alpha": self.alpha, "count": self.count, "head": self.head,
+                "max_priority": self.max_priority}
+        with open(os.path.join(self.path, META_FILE), "w") as file:
+            json.dump(meta, file)
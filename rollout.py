@@ -0,0 +1,167 @@
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from actions import NUM_ACTIONS
+from observation import OBS_SIZE
+from vecenv import VectorEnv
+
+RING_SIZE = 1024  # Steps each worker keeps before overwriting the oldest
+
+
+def random_policy(obs):
+    """Pick a uniformly random action for every observation in a batch"""
+    return np.random.randint(NUM_ACTIONS, size=len(obs))
+
+
+def layout(num_workers, ring_size, envs_per_worker):
+    """Get the (name, shape, dtype, offset) of every column in the buffer
+
+    Returns the column list and the total number of bytes needed
+    """
+    ring = (num_workers, ring_size, envs_per_worker)
+    columns = [("obs", ring + (OBS_SIZE,), np.float32),
+               ("action", ring, np.int64),
+               ("reward", ring, np.float32),
+               ("done", ring, np.bool_),
+               ("head", (num_workers,), np.int64)]
+    offset = 0
+    placed = []
+    for name, shape, dtype in columns:
+        offset = -(-offset // 8) * 8  # Keep every column 8 byte aligned
+        placed.append((name, shape, dtype, offset))
+        offset += int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return placed, offset
+
+
+def views(buf, columns):
+    """Make a NumPy array over each column of a shared buffer"""
+    return {name: np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+            for name, shape, dtype, offset in columns}
+
+
+def work(index, shm_name, columns, envs_per_worker, policy, seed, max_steps,
+         repeat, stop):
+    """Run a VectorEnv in a worker process and write steps to its ring
+
+    Arguments:
+    index -- which ring of the shared buffer this worker owns
+    shm_name -- name of the shared memory block
+    columns -- column layout of the block, from layout()
+    envs_per_worker -- number of games the worker's VectorEnv runs
+    policy -- callable mapping a batch of observations to actions
+    seed -- seed for this worker's games and policy
+    max_steps -- passed on to VectorEnv
+    repeat -- ticks each action is held for, see VectorEnv.step
+    stop -- multiprocessing.Event telling the worker to exit
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        cols = views(shm.buf, columns)
+        obs_ring, action_ring = cols["obs"][index], cols["action"][index]
+        reward_ring, done_ring = cols["reward"][index], cols["done"][index]
+        head = cols["head"]
+        ring_size = len(obs_ring)
+        np.random.seed(seed)
+        env = VectorEnv(envs_per_worker, seed=seed, max_steps=max_steps)
+        obs = env.reset()
+        while not stop.is_set():
+            slot = head[index] % ring_size
+            obs_ring[slot] = obs
+            actions = policy(obs_ring[slot])
+            obs, reward, done = env.step(actions, repeat)
+            action_ring[slot] = actions
+            reward_ring[slot] = reward
+            done_ring[slot] = done
+            head[index] += 1  # Publish the slot only once it is written
+    finally:
+        # Drop every view of the block, even if the env or policy raised,
+        # so none outlives the mapping close() frees
+        cols = obs_ring = action_ring = reward_ring = done_ring = head = None
+        shm.close()
+
+
+class RolloutPool:
+
+    def __init__(self, num_workers, envs_per_worker=16, ring_size=RING_SIZE,
+                 policy=random_policy, seed=0, max_steps=None, repeat=1):
+        """Create a RolloutPool of worker processes filling shared rings
+
+        Each worker steps its own VectorEnv and writes the observation it
+        acted on, the action, the reward and the done flag of every step into
+        its ring in one shared memory block. The learner reads them through
+        the obs, action, reward and done arrays, which are views of that
+        block shaped (num_workers, ring_size, envs_per_worker, ...). The
+        observation after slot i is in slot i + 1, which after a done step is
+        the first observation of the next episode.
+
+        Arguments:
+        num_workers -- number of worker processes
+        envs_per_worker -- number of games each worker runs in lockstep
+        ring_size -- steps each worker keeps before overwriting the oldest
+        policy -- picklable callable mapping a batch of observations to
+                  actions.ACTIONS indices
+        seed -- seed of the first worker, the others use the following ones
+        max_steps -- passed on to each worker's VectorEnv
+        repeat -- ticks each action is held for, so one step of a ring
+                  covers that many ticks
+        """
+        self.num_workers = num_workers
+        self.ring_size = ring_size
+        columns, size = layout(num_workers, ring_size, envs_per_worker)
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        cols = views(self.shm.buf, columns)
+        self.obs = cols["obs"]
+        self.action = cols["action"]
+        self.reward = cols["reward"]
+        self.done = cols["done"]
+        self.head = cols["head"]  # Steps written by each worker so far
+        self.head[:] = 0
+
+        ctx = mp.get_context("fork")  # Workers share the parent's tracker
+        self.stop = ctx.Event()
+        self.workers = [ctx.Process(
+            target=work, daemon=True,
+            args=(i, self.shm.name, columns, envs_per_worker, policy,
+                  seed + i, max_steps, repeat, self.stop))
+            for i in range(num_workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def written(self):
+        """Get a copy of how many steps each worker has written"""
+        return self.head.copy()
+
+    def latest(self, worker, count):
+        """Get ring slots holding a worker's newest complete steps
+
+        The slot a worker is currently writing is never included, and
+        slots may be overwritten again once ring_size more steps pass.
+
+        Arguments:
+        worker -- index of the worker
+        count -- number of steps wanted, at most ring_size - 1
+
+        Returns an array of slot indices, oldest first
+        """
+        head = int(self.head[worker])
+        count = min(count, head, self.ring_size - 1)
+        return np.arange(head - count, head) % self.ring_size
+
+    def close(self):
+        """Stop the workers and free the shared memory, if not done yet"""
+        if self.shm is None:
+            return
+        self.stop.set()
+        for worker in self.workers:
+            worker.join()
+        self.workers = []
+        self.obs = self.action = self.reward = self.done = self.head = None
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None
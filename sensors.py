@@ -0,0 +1,176 @@
+import numpy as np
+from asteroid import Asteroid
+from asteroidfield import rotate
+from ship import Ship
+
+SCREEN_WIDTH = 900
+SCREEN_HEIGHT = 700
+NUM_RAYS = 16  # Rays cast evenly around the Ship, the first along dir
+MAX_RANGE = SCREEN_WIDTH / 2  # Farthest a ray can see
+# Shifts of the wrapped copies of each Asteroid a ray can see
+WRAP_OFFSETS = np.array([(x, y) for x in (0, -SCREEN_WIDTH, SCREEN_WIDTH)
+                         for y in (0, -SCREEN_HEIGHT, SCREEN_HEIGHT)],
+                        dtype=np.float64)
+
+
+def rayDirs(ship_dir, num_rays=NUM_RAYS):
+    """Get unit directions of rays spread evenly around each Ship's dir
+
+    Arguments:
+    ship_dir -- (B, 2) unit vectors Ship is facing
+    num_rays -- number of rays per Ship
+
+    Returns a (B, num_rays, 2) array
+    """
+    angles = np.arange(num_rays) * (360 / num_rays)
+    return rotate(ship_dir[:, None, :], angles)
+
+
+def wrapCopies(points):
+    """Repeat (B, M, ...) points at every WRAP_OFFSETS shift along axis 1"""
+    shift = WRAP_OFFSETS.reshape((1, len(WRAP_OFFSETS), 1) +
+                                 (1,) * (points.ndim - 3) + (2,))
+    copies = points[:, None] + shift
+    return copies.reshape((len(points), -1) + points.shape[2:])
+
+
+def castCircles(origin, dirs, centers, radii, alive, max_range=MAX_RANGE):
+    """Cast rays against circles and their wrapped copies
+
+    Arguments:
+    origin -- (B, 2) start of every ray of a game
+    dirs -- (B, K, 2) unit ray directions
+    centers -- (B, M, 2) circle centers
+    radii -- (B, M) circle radii
+    alive -- (B, M) mask of which circles exist
+    max_range -- distance reported when a ray hits nothing
+
+    Returns (B, K) distances and (B, K) indices of the circle hit, -1 if none
+    """
+    num = centers.shape[1]
+    offset = wrapCopies(centers) - origin[:, None, :]  # (B, G, 2)
+    radii = np.tile(radii, (1, len(WRAP_OFFSETS)))
+    alive = np.tile(alive, (1, len(WRAP_OFFSETS)))
+    along = np.einsum("bgi,bki->bkg", offset, dirs)
+    miss_sq = (offset * offset).sum(-1)[:, None, :] - along * along
+    half_chord_sq = (radii * radii)[:, None, :] - miss_sq
+    half_chord = np.sqrt(np.maximum(half_chord_sq, 0))
+    near, far = along - half_chord, along + half_chord
+    # A ray starting inside a circle hits it at distance 0
+    dist = np.where(near >= 0, near, np.where(far >= 0, 0, np.inf))
+    dist[(half_chord_sq < 0) | ~alive[:, None, :]] = np.inf
+    return nearest(dist, num, max_range)
+
+
+def castPolygons(origin, dirs, verts, alive, max_range=MAX_RANGE):
+    """Cast rays against polygon outlines and their wrapped copies
+
+    Arguments:
+    origin -- (B, 2) start of every ray of a game
+    dirs -- (B, K, 2) unit ray directions
+    verts -- (B, M, V, 2) polygon vertices in order
+    alive -- (B, M) mask of which polygons exist
+    max_range -- distance reported when a ray hits nothing
+
+    Returns (B, K) distances and (B, K) indices of the polygon hit, -1 if none
+    """
+    num = verts.shape[1]
+    start = wrapCopies(verts) - origin[:, None, None, :]  # (B, G, V, 2)
+    edge = np.roll(start, -1, axis=2) - start
+    alive = np.tile(alive, (1, len(WRAP_OFFSETS)))
+    d = dirs[:, :, None, None, :]
+    s, e = start[:, None], edge[:, None]
+    denom = d[..., 0] * e[..., 1] - d[..., 1] * e[..., 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dist = (s[..., 0] * e[..., 1] - s[..., 1] * e[..., 0]) / denom
+        along_edge = (s[..., 0] * d[..., 1] - s[..., 1] * d[..., 0]) / denom
+    # Half open edges, so a ray through a vertex crosses only one of them
+    hit = (denom != 0) & (dist >= 0) & (along_edge >= 0) & (along_edge < 1)
+    # A ray starting inside a polygon crosses its outline an odd number of
+    # times and hits it at distance 0, like castCircles
+    inside = hit.sum(axis=-1) % 2 == 1
+    dist = np.where(inside, 0, np.where(hit, dist, np.inf).min(axis=-1))
+    dist[~np.broadcast_to(alive[:, None, :], dist.shape)] = np.inf
+    return nearest(dist, num, max_range)
+
+
+def nearest(dist, num, max_range):
+    """Reduce (B, K, G) hit distances over wrapped copies to the closest"""
+    if dist.shape[-1] == 0:
+        shape = dist.shape[:2]
+        return np.full(shape, float(max_range)), np.full(shape, -1)
+    index = dist.argmin(axis=-1)
+    best = np.take_along_axis(dist, index[..., None], axis=-1)[..., 0]
+    hit = best <= max_range
+    return np.where(hit, best, max_range), np.where(hit, index % num, -1)
+
+
+def sense(ship_pos, ship_vel, ship_dir, ast_pos, ast_vel, ast_radius,
+          ast_alive, ast_verts=None, num_rays=NUM_RAYS, max_range=MAX_RANGE,
+          velocity=False):
+    """Build ray sensor observations of a batch of games
+
+    Arguments:
+    ship_pos -- (B, 2) Ship positions
+    ship_vel -- (B, 2) Ship velocities
+    ship_dir -- (B, 2) unit vectors Ship is facing
+    ast_pos -- (B, M, 2) Asteroid positions
+    ast_vel -- (B, M, 2) Asteroid velocities
+    ast_radius -- (B, M) Asteroid radii
+    ast_alive -- (B, M) mask of which Asteroid slots are in use
+    ast_verts -- (B, M, V, 2) Asteroid outlines to hit exactly. None to
+                 treat Asteroids as circles of ast_radius
+    num_rays -- number of rays per Ship
+    max_range -- farthest a ray can see
+    velocity -- also report how fast what each ray hit moves along it,
+                relative to the Ship
+
+    Returns a (B, num_rays) float32 array of distances scaled to [0, 1],
+    followed by num_rays relative speeds scaled by the fastest possible
+    closing speed when velocity is set
+    """
+    dirs = rayDirs(ship_dir, num_rays)
+    # Only cast against as many slots as the fullest game uses
+    used = int(ast_alive.sum(axis=1).max(initial=0))
+    if used < ast_alive.shape[1]:
+        slots = np.argsort(~ast_alive, axis=1, kind="stable")[:, :used]
+        rows = np.arange(len(slots))[:, None]
+        ast_pos, ast_vel = ast_pos[rows, slots], ast_vel[rows, slots]
+        ast_radius, ast_alive = ast_radius[rows, slots], ast_alive[rows, slots]
+        if ast_verts is not None:
+            ast_verts = ast_verts[rows, slots]
+    if ast_verts is None:
+        dist, hit = castCircles(ship_pos, dirs, ast_pos, ast_radius,
+                                ast_alive, max_range)
+    else:
+        dist, hit = castPolygons(ship_pos, dirs, ast_verts, ast_alive,
+                                 max_range)
+    obs = dist / max_range
+    if velocity:
+        if used:
+            rows = np.arange(len(hit))[:, None]
+            rel_vel = ast_vel[rows, np.maximum(hit, 0)] - ship_vel[:, None, :]
+            speed = np.where(hit >= 0, (rel_vel * dirs).sum(-1), 0)
+        else:
+            speed = np.zeros_like(dist)  # No Asteroids for any ray to hit
+        obs = np.concatenate((obs, speed / (Asteroid.vel_lim + Ship.vel_lim)),
+                             axis=-1)
+    return obs.astype(np.float32)
+
+
+def senseWorld(world, exact=False, **kwargs):
+    """Build the ray sensor observation of a single World
+
+    Arguments:
+    world -- World to observe
+    exact -- cast against Asteroid outlines instead of circles
+    kwargs -- passed on to sense()
+    """
+    n = len(world.asteroids)
+    ship = world.ship
+    field = world.asteroids
+    return sense(np.array([ship.pos]), np.array([ship.vel]),
+                 np.array([ship.dir]), field.pos[None, :n],
+                 field.vel[None, :n], field.radius[None, :n],
+                 np.ones((1, n), dtype=bool),
+                 field.verts[None] if exact else None, **kwargs)[0]
@@ -1,6 +1,5 @@
 import pygame
 import math
-import time
 from controller import Player
 vec2 = pygame.math.Vector2
 
@@ -31,6 +30,7 @@ class Ship:
         self.surface = surface  # surface to draw ship to
         # Movement state
         self.pos = vec2(pos)
+        self.prev_pos = vec2(pos)  # position at previous tick, for drawing
         self.vel = vec2((0, 0))  # velocity of ship
         self.acc = 0  # Acceleration of ship along dir
         self.dir = vec2(dir).normalize()  # direction ship is pointing
@@ -53,12 +53,15 @@ class Ship:
             self.pos.y + Ship.size < 0 or \
             self.pos.y - Ship.size > SCREEN_HEIGHT
 
-    def update(self, dt):
+    def update(self, dt, now):
         """Update state of Ship
 
         Arguments:
         dt -- Delta time to modify state calculations
+        now -- Current simulated time in seconds, used to pace shooting
         """
+        self.prev_pos = vec2(self.pos)
+
         # Update direction
         angle = Ship.rot_vel if self.left else 0
         angle = angle - Ship.rot_vel if self.right else angle
@@ -78,16 +81,20 @@ class Ship:
         if not self.reenter and self.pos.x + Ship.size < 0:
             self.reenter = True
             self.pos.x = SCREEN_WIDTH + Ship.size
+            self.prev_pos.x = self.pos.x
         elif not self.reenter and self.pos.x - Ship.size > SCREEN_WIDTH:
             self.reenter = True
             self.pos.x = 0 - Ship.size
+            self.prev_pos.x = self.pos.x
 
         if not self.reenter and self.pos.y + Ship.size < 0:
             self.reenter = True
             self.pos.y = SCREEN_HEIGHT + Ship.size
+            self.prev_pos.y = self.pos.y
         elif not self.reenter and self.pos.y - Ship.size > SCREEN_HEIGHT:
             self.reenter = True
             self.pos.y = 0 - Ship.size
+            self.prev_pos.y = self.pos.y
 
         self.rect.center = self.pos
 
@@ -100,26 +107,35 @@ class Ship:
 
         # Spawn bullets
         if self.shooting:
-            cur_time = time.time()
-            since_last = cur_time - self.last_shot_time if self.last_shot_time != -1 else 0
-            if self.last_shot_time == -1 or since_last >= 1 / Ship.shots_per_sec:
+            since_last = now - self.last_shot_time if self.last_shot_time != -1 else 0
+            # Tolerance keeps whole-tick shot intervals from rounding down
+            if self.last_shot_time == -1 or since_last >= 1 / Ship.shots_per_sec - 1e-9:
                 nose = self.pos + self.dir * (Ship.size / 2)
                 if self.spawnBullet != None:
                     self.spawnBullet(nose, self.dir)
-                self.last_shot_time = cur_time
+                self.last_shot_time = now
 
-    def show(self):
-        """Draw Ship to surface"""
-        # Make vectors from center of ship to verts and rotate them through self.angle
-        vec_1 = self.dir * (Ship.size / 2)
-        vec_2 = vec2(vec_1).rotate(360 / 2.75)
-        vec_3 = vec2(vec_1).rotate(-360 / 2.75)
+    def show(self, alpha=1):
+        """Draw Ship to surface
 
-        vecs = [vec_1, vec_2, vec_3]
-        draw_verts = [self.pos + vec for vec in vecs]
+        Arguments:
+        alpha -- Fraction of the way from the previous tick to draw Ship at
+        """
+        pos = self.prev_pos.lerp(self.pos, alpha)
+        draw_verts = [pos + vec for vec in Ship.outline(self.dir)]
         self.rect = pygame.draw.polygon(self.surface, Ship.color, draw_verts, 1)
         return self.rect
 
+    @staticmethod
+    def outline(dir):
+        """Get the corners of the Ship's triangle relative to its center
+
+        Arguments:
+        dir -- unit vector the Ship is facing
+        """
+        vec_1 = vec2(dir) * (Ship.size / 2)
+        return [vec_1, vec_1.rotate(360 / 2.75), vec_1.rotate(-360 / 2.75)]
+
     def accelerate(self, accel=True):
         """Cause Ship to de/accelerate in direction Ship is facing
 
@@ -149,6 +165,20 @@ class Ship:
         """Shoot a Bullet from Ship"""
         self.shooting = start
 
+    def setControls(self, accel, left, right, shoot):
+        """Set all movement and shooting controls of the Ship at once
+
+        Arguments:
+        accel -- 1 to accelerate, -1 to decelerate, 0 to coast
+        left -- Whether the Ship is turning left
+        right -- Whether the Ship is turning right
+        shoot -- Whether the Ship is shooting
+        """
+        self.acc = accel * Ship.acc_mag
+        self.left = left
+        self.right = right
+        self.shooting = shoot
+
     def handle_event(self, event):
         """Handle an event through Controller
 
@@ -157,6 +187,14 @@ class Ship:
         """
         self.controller.handle_event(event)
 
+    def setController(self, controller):
+        """Replace the Controller steering Ship, like an Agent for a policy
+
+        Arguments:
+        controller -- Controller to set to
+        """
+        self.controller = controller
+
     def setSpawnBullet(self, func):
         """Set spawnBullet callback
 
@@ -173,6 +211,7 @@ class Ship:
         """
         # Reset movement state
         self.pos = vec2(resetPos)
+        self.prev_pos = vec2(resetPos)
         self.vel = vec2((0, 0))  # velocity of ship
         self.acc = 0  # Acceleration of ship along dir
         self.dir = vec2((1, 0)).normalize()  # direction ship is pointing
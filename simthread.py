@@ -0,0 +1,109 @@
+import queue
+import threading
+import time
+import numpy as np
+from snapshot import restoreDrawn
+from world import MAX_FRAME_TIME
+
+BUFFER_SIZE = 4096  # float64s per buffer at first, grown if a tick needs more
+
+
+class SimThread:
+
+    def __init__(self, world):
+        """Create a SimThread stepping a World at its tick rate on a thread
+
+        After every tick the World's snapshot() is written into the back
+        one of two preallocated buffers and the buffers are swapped, so
+        readers always get a whole tick. The snapshot holds the positions
+        of the last two ticks, which is all a renderer needs to interpolate
+        between them.
+
+        Arguments:
+        world -- World to step, only the thread may touch it while running
+        """
+        self.world = world
+        self.tick_time = 1 / world.tick_rate
+        self.events = queue.Queue()  # pygame events for the Ship's Controller
+        self.lock = threading.Lock()  # Held to swap or read the front buffer
+        # Whole buffers, and the snapshot views written into their start
+        self.buffers = [np.empty(BUFFER_SIZE), np.empty(BUFFER_SIZE)]
+        self.snaps = [None, None]
+        self.times = [time.perf_counter()] * 2  # When each was published
+        self.front = 0  # Buffer holding the newest snapshot
+        self.alive = True  # False once the Ship has collided
+        self.running = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Start ticking the World on a new thread"""
+        self.publish()
+        self.running.set()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop ticking and wait for the thread to finish its tick"""
+        self.running.clear()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def post(self, event):
+        """Queue a pygame event for the Ship to handle before the next tick"""
+        self.events.put(event)
+
+    def run(self):
+        """Tick the World on a fixed schedule until stopped or the Ship dies
+
+        Ticks run late rather than early, and ticks more than
+        MAX_FRAME_TIME behind are dropped like in World.advance.
+        """
+        world = self.world
+        next_tick = time.perf_counter()
+        while self.running.is_set():
+            now = time.perf_counter()
+            if now < next_tick:
+                time.sleep(next_tick - now)
+                continue
+            next_tick = max(next_tick, now - MAX_FRAME_TIME)
+            while not self.events.empty():
+                world.ship.handle_event(self.events.get())
+            alive = world.step()
+            self.publish()
+            next_tick += self.tick_time
+            if not alive:
+                self.alive = False
+                break
+
+    def publish(self):
+        """Write a snapshot of the World to the back buffer and swap
+
+        The back buffer is only written by this thread, and readers only
+        read the front one while holding the lock, so it is never written
+        while being read.
+        """
+        back = 1 - self.front
+        # Drawing never needs the random streams
+        snap = self.world.snapshot(self.buffers[back], rng=False)
+        if snap.base is not self.buffers[back]:
+            self.buffers[back] = snap  # Too small, keep the bigger one
+        with self.lock:
+            self.snaps[back] = snap
+            self.times[back] = time.perf_counter()
+            self.front = back
+
+    def restoreDrawn(self, world):
+        """Restore what drawing reads from the newest snapshot into a World
+
+        Arguments:
+        world -- World to draw from, not the one being ticked
+
+        Returns the fraction of a tick since the snapshot was published,
+        capped at 1, for drawing between its previous and current positions
+        """
+        with self.lock:
+            restoreDrawn(world, self.snaps[self.front])
+            published = self.times[self.front]
+        alpha = (time.perf_counter() - published) / self.tick_time
+        return min(alpha, 1)
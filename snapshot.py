@@ -0,0 +1,199 @@
+import array
+import numpy as np
+
+# A snapshot is one flat float64 array, so it pickles, saves and fits in
+# shared memory as is. It holds SHIP_FIELDS of game and Ship state, then
+# the state of each random stream, then a row per Asteroid and per Bullet.
+SHIP_FIELDS = 22
+RNG_STREAMS = ("spawn_rng", "shape_rng", "split_rng")
+RNG_WORDS = 625  # Mersenne Twister state words, the last is its position
+# The uint32 words are packed two to a float64 field, plus gauss_next, NaN
+# when there is none
+RNG_PACKED = (RNG_WORDS + 1) // 2
+RNG_FIELDS = RNG_PACKED + 1
+RNG_VERSION = 3  # random.Random state version the words are stored for
+ASTEROID_FIELDS = 13
+BULLET_FIELDS = 6
+# AsteroidField arrays in the order of their snapshot columns
+ASTEROID_ARRAYS = ("pos", "prev_pos", "vel", "rot_vel", "level", "radius",
+                   "shape", "angle", "extent", "reenter")
+RNG_START = SHIP_FIELDS
+ASTEROID_START = RNG_START + len(RNG_STREAMS) * RNG_FIELDS
+
+
+def snapshot(world, out=None, rng=True):
+    """Pack the full simulation state of a World into an array
+
+    Drawing state, the Ship's Controller and the real time accumulator are
+    left out, they do not change what the next ticks simulate.
+
+    Arguments:
+    world -- World to pack
+    rng -- also pack the random streams, by far the slowest part. A
+           snapshot without them can only be restored with rng=False
+    out -- float64 array to pack into if it is long enough, to reuse it
+           instead of allocating
+
+    Returns a 1D float64 array for restore(), a view of the start of out
+    if it was used
+    """
+    asteroids = world.asteroids
+    n = len(asteroids)
+    m = len(world.bullets)
+    ship = world.ship
+    size = ASTEROID_START + n * ASTEROID_FIELDS + m * BULLET_FIELDS
+    snap = out[:size] if out is not None and len(out) >= size else \
+        np.empty(size)
+    snap[:SHIP_FIELDS] = (
+        n, m, world.ticks, world.score, world.maxscore,
+        world.asteroid_spawn_count, ship.pos.x, ship.pos.y, ship.prev_pos.x,
+        ship.prev_pos.y, ship.vel.x, ship.vel.y, ship.dir.x, ship.dir.y,
+        ship.acc, ship.left, ship.right, ship.shooting, ship.last_shot_time,
+        ship.reenter, ship.dead, rng)
+
+    start = RNG_START
+    for name in RNG_STREAMS if rng else ():
+        _, words, gauss = getattr(world, name).getstate()
+        # Through array as numpy converts a tuple of ints far slower
+        words = array.array("I", words)
+        words.append(0)  # Pad to a whole float64
+        snap[start:start + RNG_PACKED] = np.frombuffer(words, np.float64)
+        snap[start + RNG_PACKED] = np.nan if gauss is None else gauss
+        start += RNG_FIELDS
+
+    rows = snap[ASTEROID_START:ASTEROID_START + n * ASTEROID_FIELDS]
+    rows = rows.reshape(n, ASTEROID_FIELDS)
+    col = 0
+    for name in ASTEROID_ARRAYS:
+        arr = getattr(asteroids, name)[:n]
+        width = arr.shape[1] if arr.ndim == 2 else 1
+        rows[:, col:col + width] = arr.reshape(n, width)
+        col += width
+
+    rows = snap[ASTEROID_START + n * ASTEROID_FIELDS:]
+    rows = rows.reshape(m, BULLET_FIELDS)
+    for row, bullet in zip(rows, world.bullets):
+        row[:] = (bullet.pos.x, bullet.pos.y, bullet.prev_pos.x,
+                  bullet.prev_pos.y, bullet.dir.x, bullet.dir.y)
+    return snap
+
+
+def restore(world, snap, rng=True):
+    """Set a World back to the state packed into a snapshot
+
+    The World must have the tick rate and collision mode of the World the
+    snapshot was taken from. Its EpisodeLog, if recording, is cut back to
+    the ticks of the snapshot.
+
+    Arguments:
+    world -- World to restore, it keeps its surface and Controller
+    snap -- array from snapshot()
+    rng -- also restore the random streams. Without them the ticks after
+           restoring spawn and split differently, which is cheaper for
+           branches that don't need to match
+    """
+    (n, m, ticks, score, maxscore, spawn_count, pos_x, pos_y, prev_x,
+     prev_y, vel_x, vel_y, dir_x, dir_y, acc, left, right, shooting,
+     last_shot_time, reenter, dead, has_rng) = snap[:SHIP_FIELDS].tolist()
+    if rng and not has_rng:
+        raise ValueError("snapshot was taken without the random streams")
+    world.ticks = int(ticks)
+    world.score = int(score)
+    world.maxscore = int(maxscore)
+    world.asteroid_spawn_count = int(spawn_count)
+    if world.log is not None:
+        del world.log.inputs[world.ticks:]
+
+    ship = world.ship
+    ship.pos.update(pos_x, pos_y)
+    ship.prev_pos.update(prev_x, prev_y)
+    ship.vel.update(vel_x, vel_y)
+    ship.dir.update(dir_x, dir_y)
+    ship.acc = acc
+    ship.left = bool(left)
+    ship.right = bool(right)
+    ship.shooting = bool(shooting)
+    ship.last_shot_time = last_shot_time
+    ship.reenter = bool(reenter)
+    ship.dead = bool(dead)
+    ship.rect.center = ship.pos
+
+    if rng:
+        start = RNG_START
+        for name in RNG_STREAMS:
+            words = snap[start:start + RNG_PACKED].view(np.uint32)
+            gauss = snap[start + RNG_PACKED]
+            getattr(world, name).setstate(
+                (RNG_VERSION, tuple(words[:RNG_WORDS].tolist()),
+                 None if np.isnan(gauss) else gauss))
+            start += RNG_FIELDS
+
+    restoreEntities(world, snap, int(n), int(m), ASTEROID_ARRAYS)
+
+
+def restoreDrawn(world, snap):
+    """Restore only what drawing a World reads from a snapshot
+
+    Sets the Ship's position and heading, the scores and every Asteroid
+    and Bullet. Velocities, controls and the random streams are left as
+    they were, so the World is only fit to draw, not to step.
+
+    Arguments:
+    world -- World to draw the snapshot with
+    snap -- array from snapshot()
+    """
+    (n, m, _, score, maxscore, _, pos_x, pos_y, prev_x, prev_y, _, _, dir_x,
+     dir_y) = snap[:14].tolist()
+    world.score = int(score)
+    world.maxscore = int(maxscore)
+    ship = world.ship
+    ship.pos.update(pos_x, pos_y)
+    ship.prev_pos.update(prev_x, prev_y)
+    ship.dir.update(dir_x, dir_y)
+    restoreEntities(world, snap, int(n), int(m),
+                    ("pos", "prev_pos", "level", "shape", "angle"))
+
+
+def restoreEntities(world, snap, n, m, names):
+    """Restore the Asteroids and Bullets of a snapshot
+
+    Bullets already in play are reused, only the difference in count goes
+    to or comes from the pool.
+
+    Arguments:
+    world -- World to restore
+    snap -- array from snapshot()
+    n -- number of Asteroids in snap
+    m -- number of Bullets in snap
+    names -- AsteroidField arrays to restore, from ASTEROID_ARRAYS
+    """
+    asteroids = world.asteroids
+    if n > len(asteroids.pos):
+        asteroids.grow(n)
+    rows = snap[ASTEROID_START:ASTEROID_START + n * ASTEROID_FIELDS]
+    rows = rows.reshape(n, ASTEROID_FIELDS)
+    col = 0
+    for name in ASTEROID_ARRAYS:
+        arr = getattr(asteroids, name)
+        width = arr.shape[1] if arr.ndim == 2 else 1
+        if name in names:
+            arr[:n] = rows[:, col:col + width].reshape(arr[:n].shape)
+        col += width
+    asteroids.count = n
+    asteroids.world_verts = None
+
+    bullets = world.bullets
+    if len(bullets) > m:
+        world.bullet_pool.release(bullets[m:])
+        del bullets[m:]
+    ship = world.ship
+    while len(bullets) < m:
+        bullets.append(world.bullet_pool.acquire(ship.pos, ship.dir))
+    rows = snap[ASTEROID_START + n * ASTEROID_FIELDS:]
+    for bullet, (pos_x, pos_y, prev_x, prev_y, dir_x, dir_y) in zip(
+            bullets, rows[:m * BULLET_FIELDS].reshape(m, BULLET_FIELDS)
+            .tolist()):
+        bullet.pos.update(pos_x, pos_y)
+        bullet.prev_pos.update(prev_x, prev_y)
+        bullet.dir.update(dir_x, dir_y)
+        bullet.rect.center = bullet.pos
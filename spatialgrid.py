@@ -0,0 +1,115 @@
+import math
+import numpy as np
+from asteroid import Asteroid
+
+SCREEN_WIDTH = 900
+SCREEN_HEIGHT = 700
+CELL_SIZE = Asteroid.radii[-1]  # Largest Asteroids cover at most 3x3 cells
+DENSE_PAIRS = 512  # Below this many pairs, testing them all is cheaper
+
+
+def expand(counts):
+    """Expand per-owner counts into flat (owner, offset) index arrays
+
+    Arguments:
+    counts -- number of entries each owner has
+
+    Returns arrays 'owner' and 'offset' with one element per entry, so entry
+    j is number offset[j] of owner[j]
+    """
+    owner = np.repeat(np.arange(len(counts)), counts)
+    starts = np.cumsum(counts) - counts
+    offset = np.arange(len(owner)) - starts[owner]
+    return owner, offset
+
+
+class SpatialGrid:
+
+    def __init__(self, cell_size=CELL_SIZE, width=SCREEN_WIDTH,
+                 height=SCREEN_HEIGHT):
+        """Create a uniform grid over the screen for finding nearby circles
+
+        Cells wrap around the screen edges, so positions off the screen,
+        like Asteroids drifting back in, still map onto the grid.
+
+        Arguments:
+        cell_size -- width and height of each cell
+        width -- width of the area the grid wraps around
+        height -- height of the area the grid wraps around
+        """
+        self.cell_size = cell_size
+        self.cols = math.ceil(width / cell_size)
+        self.rows = math.ceil(height / cell_size)
+        self.pos = np.zeros((0, 2))  # Circles given to last build
+        self.radius = np.zeros(0)
+        self.groups = None
+        self.indexed = True  # Whether keys and items match pos
+        self.keys = np.zeros(0, dtype=np.int64)  # Sorted cell keys
+        self.items = np.zeros(0, dtype=np.int64)  # Circle in each cell entry
+
+    def cover(self, pos, radius, groups=None):
+        """Get the cells each circle's bounding square overlaps
+
+        Arguments:
+        pos -- (N, 2) array of circle centers
+        radius -- radius of each circle, or one radius shared by all
+        groups -- separate grid each circle is in, like its game. None
+                  puts every circle in one grid
+
+        Returns arrays 'items' and 'keys', one element per (circle, cell)
+        """
+        radius = np.broadcast_to(radius, (len(pos),))[:, None]
+        lo = np.floor((pos - radius) / self.cell_size).astype(np.int64)
+        hi = np.floor((pos + radius) / self.cell_size).astype(np.int64)
+        span = hi - lo + 1
+        items, offset = expand(span[:, 0] * span[:, 1])
+        cell_x = lo[items, 0] + offset % span[items, 0]
+        cell_y = lo[items, 1] + offset // span[items, 0]
+        keys = (cell_y % self.rows) * self.cols + (cell_x % self.cols)
+        if groups is not None:
+            keys += groups[items] * (self.rows * self.cols)
+        return items, keys
+
+    def build(self, pos, radius, groups=None):
+        """Index a set of circles, replacing anything indexed before
+
+        Cells are only filled in once a query is too big to test densely.
+
+        Arguments:
+        pos -- (N, 2) array of circle centers
+        radius -- radius of each circle
+        groups -- separate grid each circle is in. None for a single grid
+        """
+        self.pos = pos
+        self.radius = radius
+        self.groups = groups
+        self.indexed = False
+
+    def query(self, pos, radius, groups=None):
+        """Find indexed circles that may overlap each query circle
+
+        Arguments:
+        pos -- (M, 2) array of query circle centers
+        radius -- radius of each query circle, or one shared radius
+        groups -- grid each query circle searches, matching build()
+
+        Returns unique candidate pairs as arrays of query and indexed circle
+        indices, sorted by indexed circle
+        """
+        if groups is None and len(self.pos) * len(pos) <= DENSE_PAIRS:
+            pairs = np.arange(len(self.pos) * len(pos))
+            return pairs % len(pos), pairs // len(pos)
+        if not self.indexed:
+            items, keys = self.cover(self.pos, self.radius, self.groups)
+            order = np.argsort(keys, kind="stable")
+            self.keys = keys[order]
+            self.items = items[order]
+            self.indexed = True
+
+        queries, keys = self.cover(pos, radius, groups)
+        first = np.searchsorted(self.keys, keys, "left")
+        last = np.searchsorted(self.keys, keys, "right")
+        entry, offset = expand(last - first)
+        found = self.items[first[entry] + offset]
+        pairs = np.unique(found * len(pos) + queries[entry])
+        return pairs % len(pos), pairs // len(pos)
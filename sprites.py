@@ -0,0 +1,123 @@
+import math
+import numpy as np
+import pygame
+from asteroid import Asteroid
+from bullet import Bullet
+from ship import Ship
+vec2 = pygame.math.Vector2
+
+SHIP_STEPS = 64  # Headings the Ship is pre-rasterized at
+ASTEROID_STEPS = 32  # Angles each Asteroid template is pre-rasterized at
+BACKGROUND = (0, 0, 0)
+
+
+def makeSprite(size, color):
+    """Make an empty 8 bit sprite whose background is see-through
+
+    Arguments:
+    size -- width and height of the sprite
+    color -- only color that will be drawn on the sprite
+    """
+    sprite = pygame.Surface((size, size), 0, 8)
+    sprite.set_palette([BACKGROUND, color])
+    sprite.set_colorkey(BACKGROUND)
+    return sprite
+
+
+class SpriteAtlas:
+
+    def __init__(self, ship_steps=SHIP_STEPS, asteroid_steps=ASTEROID_STEPS):
+        """Create a SpriteAtlas of pre-rasterized rotated entity outlines
+
+        Sprites are rasterized the first time each heading or angle is
+        needed and kept for every later frame, or all at once by
+        prerender().
+
+        Arguments:
+        ship_steps -- number of headings to rasterize the Ship at
+        asteroid_steps -- number of angles to rasterize each template at
+        """
+        self.ship_steps = ship_steps
+        self.asteroid_steps = asteroid_steps
+        self.ship_sprites = {}  # Keyed by heading step
+        self.asteroid_sprites = {}  # Keyed by (level, shape, angle step)
+        self.bullet_sprite = makeSprite(Bullet.radius * 2 + 1, Bullet.color)
+        center = Bullet.radius
+        pygame.draw.circle(self.bullet_sprite, Bullet.color,
+                           (center, center), Bullet.radius)
+
+    def shipSprite(self, step):
+        """Get the Ship outline rasterized at a heading step"""
+        sprite = self.ship_sprites.get(step)
+        if sprite is None:
+            size = Ship.size + 3  # Room for the 1px wide outline
+            sprite = makeSprite(size, Ship.color)
+            center = vec2(size / 2, size / 2)
+            vecs = Ship.outline(
+                vec2(1, 0).rotate(step * 360 / self.ship_steps))
+            pygame.draw.polygon(sprite, Ship.color,
+                                [center + vec for vec in vecs], 1)
+            self.ship_sprites[step] = sprite
+        return sprite
+
+    def asteroidSprite(self, level, shape, step):
+        """Get an Asteroid template rasterized at an angle step"""
+        key = (level, shape, step)
+        sprite = self.asteroid_sprites.get(key)
+        if sprite is None:
+            outline, extent = Asteroid.templates[level][shape]
+            size = 2 * int(extent) + 3  # Room for the 1px wide outline
+            sprite = makeSprite(size, Asteroid.color)
+            center = vec2(size / 2, size / 2)
+            angle = step * 360 / self.asteroid_steps
+            pygame.draw.polygon(sprite, Asteroid.color,
+                                [center + vert.rotate(angle)
+                                 for vert in outline], 1)
+            self.asteroid_sprites[key] = sprite
+        return sprite
+
+    def prerender(self):
+        """Rasterize every sprite up front instead of on first use"""
+        for step in range(self.ship_steps):
+            self.shipSprite(step)
+        for level, templates in enumerate(Asteroid.templates):
+            for shape in range(len(templates)):
+                for step in range(self.asteroid_steps):
+                    self.asteroidSprite(level, shape, step)
+
+    def draw(self, surface, world, alpha=1):
+        """Draw every entity of a World with one batched blit
+
+        Arguments:
+        surface -- pygame.Surface to draw to
+        world -- World whose entities to draw
+        alpha -- Fraction of the way from the previous tick to draw at
+
+        Returns the list of rects drawn over
+        """
+        blits = []
+        ship = world.ship
+        heading = math.degrees(math.atan2(ship.dir.y, ship.dir.x))
+        sprite = self.shipSprite(
+            round(heading * self.ship_steps / 360) % self.ship_steps)
+        pos = ship.prev_pos.lerp(ship.pos, alpha)
+        half = sprite.get_width() / 2
+        blits.append((sprite, (int(pos.x - half), int(pos.y - half))))
+
+        field = world.asteroids
+        n = len(field)
+        pos = field.prev_pos[:n] + (field.pos[:n] - field.prev_pos[:n]) * alpha
+        steps = np.rint(field.angle[:n] * self.asteroid_steps / 360)
+        steps = steps.astype(np.int64) % self.asteroid_steps
+        for level, shape, step, (x, y) in zip(field.level[:n].tolist(),
+                                              field.shape[:n].tolist(),
+                                              steps.tolist(), pos.tolist()):
+            sprite = self.asteroidSprite(level, shape, step)
+            half = sprite.get_width() / 2
+            blits.append((sprite, (int(x - half), int(y - half))))
+
+        for bullet in world.bullets:
+            pos = bullet.prev_pos.lerp(bullet.pos, alpha)
+            blits.append((self.bullet_sprite, (int(pos.x) - Bullet.radius,
+                                               int(pos.y) - Bullet.radius)))
+        return surface.blits(blits)
@@ -0,0 +1,79 @@
+from collections import OrderedDict
+import pygame
+
+FONT_FILE = "Hyperspace Bold Italic.otf"
+MAX_SURFACES = 128  # Rendered strings kept before dropping the oldest
+
+
+class TextCache:
+
+    def __init__(self, font_file=FONT_FILE, max_surfaces=MAX_SURFACES):
+        """Create a TextCache of loaded fonts and rendered text
+
+        Arguments:
+        font_file -- font file to render text with
+        max_surfaces -- number of rendered strings to keep, least recently
+                        used are dropped first
+        """
+        self.font_file = font_file
+        self.max_surfaces = max_surfaces
+        self.fonts = {}  # Loaded pygame.font.Font for each size
+        self.surfaces = OrderedDict()  # LRU of rendered strings
+
+    def getFont(self, size):
+        """Get the font at a size, loading it only the first time"""
+        if size not in self.fonts:
+            self.fonts[size] = pygame.font.Font(self.font_file, size)
+        return self.fonts[size]
+
+    def size(self, text, size):
+        """Get the (width, height) text would be rendered at"""
+        return self.getFont(size).size(text)
+
+    def render(self, text, size, color):
+        """Get a Surface with text rendered on it
+
+        The returned Surface is shared with later calls, so copy it before
+        changing it, like setting its alpha.
+
+        Arguments:
+        text -- string to render
+        size -- font size to render at
+        color -- color of the text
+        """
+        key = (self.font_file, size, text, tuple(color))
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.getFont(size).render(text, False, color)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.max_surfaces:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
+
+    def drawNumber(self, surface, pos, label, number, size, color):
+        """Draw a label followed by a number from cached glyphs
+
+        Each digit is rendered once and reused, so changing numbers never
+        render new text.
+
+        Arguments:
+        surface -- pygame.Surface to draw to
+        pos -- upper left corner to draw at
+        label -- text drawn before the number
+        number -- integer to draw
+        size -- font size to draw at
+        color -- color of the text
+
+        Returns the rect drawn over
+        """
+        glyphs = [self.render(label, size, color)] + \
+            [self.render(digit, size, color) for digit in str(number)]
+        x, y = pos
+        blits = []
+        for glyph in glyphs:
+            blits.append((glyph, (x, y)))
+            x += glyph.get_width()
+        rects = surface.blits(blits)
+        return rects[0].unionall(rects[1:])
@@ -0,0 +1,535 @@
+import numpy as np
+from actions import ACTIONS
+from asteroid import Asteroid, AST_SPEED_MAX, AST_SPEED_MIN, NUM_TEMPLATES
+from asteroidfield import TEMPLATE_EXTENTS, TEMPLATE_OUTLINES, advance, \
+    rotate
+from bullet import Bullet
+from collision import COLLISION_MODES, circleHulls, shipHulls, \
+    sweptCircles, sweptPolygons
+from observation import OBS_SIZE, observe
+from sensors import NUM_RAYS, sense
+from ship import Ship
+from spatialgrid import SpatialGrid, expand
+from world import MIN_ASTEROIDS, DIFFICULTY_INCREASE_THRESHOLD, \
+    ASTEROID_DIFFICULTY_INCREMENT, TICK_RATE, SPEED_PER_SECOND
+
+SCREEN_WIDTH = 900
+SCREEN_HEIGHT = 700
+MAX_ASTEROIDS = 96  # Asteroid slots per game, extra spawns are dropped
+MAX_BULLETS = 32  # Bullet slots per game, more than Ship can keep alive
+OBS_MODES = ("nearest", "rays")
+
+ACTION_ACCEL = np.array([action[0] for action in ACTIONS], dtype=np.float64)
+ACTION_LEFT = np.array([action[1] for action in ACTIONS])
+ACTION_RIGHT = np.array([action[2] for action in ACTIONS])
+ACTION_SHOOT = np.array([action[3] for action in ACTIONS])
+RADII = np.array(Asteroid.radii, dtype=np.float64)
+
+
+class VectorEnv:
+
+    def __init__(self, num_envs, seed=None, max_steps=None,
+                 tick_rate=TICK_RATE, obs_mode="nearest",
+                 collisions="discrete", max_asteroids=MAX_ASTEROIDS):
+        """Create a VectorEnv running many games of Asteroids in lockstep
+
+        Every game is stored as rows of stacked NumPy arrays and advanced by
+        the same rules as World.step, so one step() call moves them all.
+
+        Arguments:
+        num_envs -- number of games to run
+        seed -- seed for the random spawns and splits of every game
+        max_steps -- end episodes after this many ticks. None to never cut
+                     an episode short
+        tick_rate -- Number of fixed simulation ticks per simulated second
+        obs_mode -- "nearest" for observation.observe features, "rays" for
+                    sensors.sense ray distances and speeds
+        collisions -- one of collision.COLLISION_MODES
+        max_asteroids -- Asteroid slots per game, fewer make every tick
+                         cheaper
+        """
+        if collisions not in COLLISION_MODES:
+            raise ValueError("unknown collision mode %r" % collisions)
+        if obs_mode not in OBS_MODES:
+            raise ValueError("unknown obs mode %r" % obs_mode)
+        self.num_envs = num_envs
+        self.collisions = collisions
+        self.obs_mode = obs_mode
+        self.obs_size = OBS_SIZE if obs_mode == "nearest" else 2 * NUM_RAYS
+        self.max_steps = max_steps
+        self.tick_rate = tick_rate
+        self.tick_dt = SPEED_PER_SECOND / tick_rate
+        self.rng = np.random.default_rng(seed)
+        n = num_envs
+        slots = max_asteroids
+        # Ship state
+        self.ship_pos = np.zeros((n, 2))
+        self.ship_prev_pos = np.zeros((n, 2))  # for swept collisions
+        self.ship_vel = np.zeros((n, 2))
+        self.ship_dir = np.zeros((n, 2))
+        self.ship_reenter = np.zeros(n, dtype=bool)
+        self.last_shot_time = np.zeros(n)
+        # Asteroid state, one row of slots per game
+        self.ast_alive = np.zeros((n, slots), dtype=bool)
+        self.ast_pos = np.zeros((n, slots, 2))
+        self.ast_prev_pos = np.zeros((n, slots, 2))
+        self.ast_vel = np.zeros((n, slots, 2))
+        self.ast_angle = np.zeros((n, slots))
+        self.ast_rot_vel = np.zeros((n, slots))
+        self.ast_level = np.zeros((n, slots), dtype=np.int64)
+        self.ast_radius = np.zeros((n, slots))
+        self.ast_shape = np.zeros((n, slots), dtype=np.int64)
+        self.ast_extent = np.zeros((n, slots))
+        self.ast_reenter = np.zeros((n, slots), dtype=bool)
+        # Bullet state
+        self.bul_alive = np.zeros((n, MAX_BULLETS), dtype=bool)
+        self.bul_pos = np.zeros((n, MAX_BULLETS, 2))
+        self.bul_prev_pos = np.zeros((n, MAX_BULLETS, 2))
+        self.bul_dir = np.zeros((n, MAX_BULLETS, 2))
+        # Game state
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.asteroid_spawn_count = np.zeros(n, dtype=np.int64)
+        self.grid = SpatialGrid()  # Broad phase shared by every game
+        self.resetGames(np.ones(n, dtype=bool))
+
+    def reset(self, seed=None):
+        """Reset every game and return the first observations
+
+        Arguments:
+        seed -- reseed the random spawns and splits. None keeps the stream
+        """
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self.resetGames(np.ones(self.num_envs, dtype=bool))
+        return self.observe()
+
+    def step(self, actions, repeat=1):
+        """Advance every game by repeat ticks of the same actions
+
+        The observation is only built after the last tick. Games that end
+        stop collecting reward and are reset before returning, so their
+        observation is the first one of the next episode.
+
+        Arguments:
+        actions -- (num_envs,) array of indices into actions.ACTIONS
+        repeat -- number of ticks to hold the actions for, at least 1
+
+        Returns (obs, reward, done): observations, Asteroids destroyed over
+        the ticks and whether the episode ended, one row per game
+        """
+        if repeat < 1:
+            raise ValueError("repeat must be at least 1, got %r" % repeat)
+        actions = np.asarray(actions)
+        reward = np.zeros(self.num_envs, dtype=np.float32)
+        done = np.zeros(self.num_envs, dtype=bool)
+        for _ in range(repeat):
+            tick_reward, tick_done = self.tick(actions)
+            reward += np.where(done, 0, tick_reward)
+            done |= tick_done
+        if done.any():
+            self.resetGames(done)
+        return self.observe(), reward, done
+
+    def tick(self, actions):
+        """Advance every game by one tick without resetting ended ones
+
+        Arguments:
+        actions -- (num_envs,) array of indices into actions.ACTIONS
+
+        Returns (reward, done) of this tick, see step()
+        """
+        dt = self.tick_dt
+        self.ticks += 1
+        self.updateShips(actions, dt)
+        advance(self.ast_pos, self.ast_prev_pos, self.ast_vel,
+                self.ast_angle, self.ast_rot_vel, self.ast_extent,
+                self.ast_radius, self.ast_reenter, dt)
+        gone = self.updateBullets(dt)
+        if self.collisions in ("discrete", "hull"):
+            self.bul_alive &= ~gone
+        prev_score = self.score.copy()
+        done = ~self.checkCollisions()
+        self.bul_alive &= ~gone  # Swept Bullets could hit on their way out
+        self.spawnAsteroids()
+        reward = (self.score - prev_score).astype(np.float32)
+
+        if self.max_steps is not None:
+            done |= self.ticks >= self.max_steps
+        return reward, done
+
+    def observe(self):
+        """Get the observation of every game in this env's obs_mode"""
+        if self.obs_mode == "rays":
+            return sense(self.ship_pos, self.ship_vel, self.ship_dir,
+                         self.ast_pos, self.ast_vel, self.ast_radius,
+                         self.ast_alive, velocity=True)
+        return observe(self.ship_pos, self.ship_vel, self.ship_dir,
+                       self.ast_pos, self.ast_vel, self.ast_radius,
+                       self.ast_alive)
+
+    def resetGames(self, mask):
+        """Reset the games selected by a boolean mask to their start state"""
+        self.ship_pos[mask] = (SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
+        self.ship_prev_pos[mask] = self.ship_pos[mask]
+        self.ship_vel[mask] = 0
+        self.ship_dir[mask] = (1, 0)
+        self.ship_reenter[mask] = False
+        self.last_shot_time[mask] = -1
+        self.ast_alive[mask] = False
+        self.bul_alive[mask] = False
+        self.ticks[mask] = 0
+        self.score[mask] = 0
+        self.asteroid_spawn_count[mask] = MIN_ASTEROIDS
+        self.spawnAsteroids()
+
+    def load(self, world):
+        """Copy the state of a World into every game
+
+        If the World has more Asteroids than the slots of a game only the
+        ones nearest the Ship are kept, and Bullets past MAX_BULLETS are
+        dropped. Each game keeps drawing its own splits from rng. If the
+        tick rates differ, ticks is rounded to this env's and the last shot
+        time is shifted to keep the time since it.
+
+        Arguments:
+        world -- World to copy
+        """
+        ship = self.ship_pos, self.ship_prev_pos, self.ship_vel, self.ship_dir
+        for arr, value in zip(ship, (world.ship.pos, world.ship.prev_pos,
+                                     world.ship.vel, world.ship.dir)):
+            arr[:] = value
+        self.ship_reenter[:] = world.ship.reenter
+        ticks = round(world.time() * self.tick_rate)
+        last_shot_time = world.ship.last_shot_time
+        if last_shot_time != -1:
+            last_shot_time += ticks / self.tick_rate - world.time()
+        self.last_shot_time[:] = last_shot_time
+        self.ticks[:] = ticks
+        self.score[:] = world.score
+        self.asteroid_spawn_count[:] = world.asteroid_spawn_count
+
+        asteroids = world.asteroids
+        rows = np.arange(len(asteroids))
+        slots = self.ast_alive.shape[1]
+        if len(rows) > slots:
+            off = asteroids.pos[rows] - world.ship.pos
+            rows = np.argsort((off * off).sum(-1))[:slots]
+        n = len(rows)
+        self.ast_alive[:] = False
+        self.ast_alive[:, :n] = True
+        for name in ("pos", "prev_pos", "vel", "angle", "rot_vel", "level",
+                     "radius", "shape", "extent", "reenter"):
+            getattr(self, "ast_" + name)[:, :n] = getattr(asteroids, name)[rows]
+
+        bullets = world.bullets[:MAX_BULLETS]
+        m = len(bullets)
+        self.bul_alive[:] = False
+        self.bul_alive[:, :m] = True
+        if m:
+            self.bul_pos[:, :m] = [bullet.pos for bullet in bullets]
+            self.bul_prev_pos[:, :m] = [bullet.prev_pos for bullet in bullets]
+            self.bul_dir[:, :m] = [bullet.dir for bullet in bullets]
+
+    def updateShips(self, actions, dt):
+        """Update every Ship like Ship.update with controls set by actions"""
+        turn = ACTION_LEFT[actions].astype(np.float64) - ACTION_RIGHT[actions]
+        self.ship_dir[:] = rotate(self.ship_dir, turn * Ship.rot_vel * dt)
+        acc = ACTION_ACCEL[actions] * Ship.acc_mag
+        vel = self.ship_vel
+        vel += (acc * dt)[:, None] * self.ship_dir
+        # Limit top speed
+        speed = np.hypot(vel[:, 0], vel[:, 1])
+        too_fast = speed > Ship.vel_lim
+        vel[too_fast] *= (Ship.vel_lim / speed[too_fast])[:, None]
+        self.ship_prev_pos[:] = self.ship_pos
+        self.ship_pos += vel * dt
+
+        # Wrap screen
+        x, y = self.ship_pos[:, 0], self.ship_pos[:, 1]
+        reenter = self.ship_reenter
+        left = ~reenter & (x + Ship.size < 0)
+        right = ~reenter & ~left & (x - Ship.size > SCREEN_WIDTH)
+        x[left] = SCREEN_WIDTH + Ship.size
+        x[right] = 0 - Ship.size
+        reenter |= left | right
+        top = ~reenter & (y + Ship.size < 0)
+        bottom = ~reenter & ~top & (y - Ship.size > SCREEN_HEIGHT)
+        y[top] = SCREEN_HEIGHT + Ship.size
+        y[bottom] = 0 - Ship.size
+        reenter |= top | bottom
+        wrapped = left | right | top | bottom
+        self.ship_prev_pos[wrapped] = self.ship_pos[wrapped]
+        reenter &= (x + Ship.size >= 0) & (x - Ship.size <= SCREEN_WIDTH) & \
+            (y + Ship.size >= 0) & (y - Ship.size <= SCREEN_HEIGHT)
+
+        # Spawn bullets
+        now = self.ticks / self.tick_rate
+        since_last = now - self.last_shot_time
+        fire = ACTION_SHOOT[actions] & (
+            (self.last_shot_time == -1) |
+            (since_last >= 1 / Ship.shots_per_sec - 1e-9))
+        games = np.flatnonzero(fire)
+        fits, slots = allocate(self.bul_alive, games)
+        games = games[fits]
+        self.bul_alive[games, slots] = True
+        self.bul_pos[games, slots] = self.ship_pos[games] + \
+            self.ship_dir[games] * (Ship.size / 2)
+        self.bul_dir[games, slots] = self.ship_dir[games]
+        self.last_shot_time[fire] = now[fire]
+
+    def updateBullets(self, dt):
+        """Update every Bullet like Bullet.update
+
+        Returns a mask of the Bullets now offscreen, for step() to free
+        """
+        self.bul_prev_pos[:] = self.bul_pos
+        self.bul_pos += self.bul_dir * Bullet.vel * dt
+        x, y = self.bul_pos[..., 0], self.bul_pos[..., 1]
+        return self.bul_alive & ~(
+            (x + Bullet.radius >= 0) & (x - Bullet.radius <= SCREEN_WIDTH) &
+            (y + Bullet.radius >= 0) & (y - Bullet.radius <= SCREEN_HEIGHT))
+
+    def checkCollisions(self):
+        """Handle collisions in every game like World.checkCollisions
+
+        Returns a mask of the games whose Ship has not been hit
+        """
+        if self.collisions == "discrete":
+            ship_off = self.ast_pos - self.ship_pos[:, None, :]
+            ship_reach = (Ship.size / 2) + self.ast_radius
+            ship_hit = (ship_off * ship_off).sum(-1) < ship_reach * ship_reach
+        elif self.collisions == "hull":
+            # Reject by bounding circles, only survivors get the exact test
+            ship_off = self.ast_pos - self.ship_pos[:, None, :]
+            ship_reach = (Ship.size / 2) + self.ast_extent
+            ship_hit = self.ast_alive & \
+                ((ship_off * ship_off).sum(-1) < ship_reach * ship_reach)
+            games, slots = np.nonzero(ship_hit)
+            ship_hit[games, slots] = shipHulls(
+                self.ship_pos[games], self.ship_dir[games],
+                self.ast_pos[games, slots], self.ast_level[games, slots],
+                self.ast_shape[games, slots], self.ast_angle[games, slots])
+        else:
+            shape = self.ast_pos.shape
+            ship_hit = sweptCircles(
+                np.broadcast_to(self.ship_prev_pos[:, None], shape)
+                .reshape(-1, 2),
+                np.broadcast_to(self.ship_pos[:, None], shape).reshape(-1, 2),
+                self.ast_prev_pos.reshape(-1, 2), self.ast_pos.reshape(-1, 2),
+                (Ship.size / 2) + self.ast_radius.ravel()).reshape(shape[:2])
+        ship_hit = (self.ast_alive & ship_hit).any(axis=1)
+
+        # Bullet hits through a grid per game, ignoring games the Ship lost
+        ast_games, ast_slots = np.nonzero(self.ast_alive)
+        bul_games, bul_slots = np.nonzero(
+            self.bul_alive & ~ship_hit[:, None])
+        ast_pos = self.ast_pos[ast_games, ast_slots]
+        ast_radius = self.ast_radius[ast_games, ast_slots]
+        bul_pos = self.bul_pos[bul_games, bul_slots]
+        if self.collisions == "discrete":
+            self.grid.build(ast_pos, ast_radius, ast_games)
+            b, a = self.grid.query(bul_pos, Bullet.radius, bul_games)
+            off = ast_pos[a] - bul_pos[b]
+            reach = Bullet.radius + ast_radius[a]
+            hit = (off * off).sum(-1) < reach * reach
+        elif self.collisions == "hull":
+            hit, b, a = self.hullBullets(ast_games, ast_slots, bul_games,
+                                         bul_slots)
+        else:
+            hit, b, a = self.sweptBullets(ast_games, ast_slots, bul_games,
+                                          bul_slots)
+        self.bul_alive[bul_games[b[hit]], bul_slots[b[hit]]] = False
+        ast_hit = np.zeros_like(self.ast_alive)
+        ast_hit[ast_games[a[hit]], ast_slots[a[hit]]] = True
+
+        # Score and raise spawn count for every threshold passed
+        num_hit = ast_hit.sum(axis=1)
+        passed = (self.score + num_hit) // DIFFICULTY_INCREASE_THRESHOLD - \
+            self.score // DIFFICULTY_INCREASE_THRESHOLD
+        self.asteroid_spawn_count += passed * ASTEROID_DIFFICULTY_INCREMENT
+        self.score += num_hit
+
+        self.ast_alive &= ~ast_hit
+        self.splitAsteroids(*np.nonzero(ast_hit))
+        return ~ship_hit
+
+    def sweptBullets(self, ast_games, ast_slots, bul_games, bul_slots):
+        """Find Bullets that touched Asteroids anywhere along the last tick
+
+        Arguments:
+        ast_games, ast_slots -- game and slot of every live Asteroid
+        bul_games, bul_slots -- game and slot of every Bullet to test
+
+        Returns (hit, b, a): a mask of which candidate pairs hit and the
+        index into the Bullets and Asteroids of each pair
+        """
+        polygon = self.collisions == "polygon"
+        ast_pos = self.ast_pos[ast_games, ast_slots]
+        ast_prev = self.ast_prev_pos[ast_games, ast_slots]
+        # Outlines can poke out past radius, up to extent
+        ast_reach = (self.ast_extent if polygon else
+                     self.ast_radius)[ast_games, ast_slots]
+        bul_pos = self.bul_pos[bul_games, bul_slots]
+        bul_prev = self.bul_prev_pos[bul_games, bul_slots]
+
+        # Reach far enough to cover both paths, Asteroids move at most
+        # vel_lim a tick
+        self.grid.build(ast_pos, ast_reach, ast_games)
+        query_reach = Bullet.radius + Bullet.vel * self.tick_dt / 2 + \
+            Asteroid.vel_lim * self.tick_dt
+        b, a = self.grid.query((bul_prev + bul_pos) / 2, query_reach,
+                               bul_games)
+        hit = sweptCircles(bul_prev[b], bul_pos[b], ast_prev[a], ast_pos[a],
+                           Bullet.radius + ast_reach[a])
+        if polygon and hit.any():
+            games, slots = ast_games[a[hit]], ast_slots[a[hit]]
+            outline = rotate(TEMPLATE_OUTLINES[self.ast_level[games, slots],
+                                               self.ast_shape[games, slots]],
+                             self.ast_angle[games, slots][:, None])
+            hit[hit] = sweptPolygons(bul_prev[b[hit]], bul_pos[b[hit]],
+                                     ast_prev[a[hit]], ast_pos[a[hit]],
+                                     outline)
+        return hit, b, a
+
+    def hullBullets(self, ast_games, ast_slots, bul_games, bul_slots):
+        """Find Bullets touching Asteroid hulls, rejecting by extent first
+
+        Arguments and return value are the same as sweptBullets
+        """
+        ast_pos = self.ast_pos[ast_games, ast_slots]
+        ast_extent = self.ast_extent[ast_games, ast_slots]
+        bul_pos = self.bul_pos[bul_games, bul_slots]
+        self.grid.build(ast_pos, ast_extent, ast_games)
+        b, a = self.grid.query(bul_pos, Bullet.radius, bul_games)
+        off = ast_pos[a] - bul_pos[b]
+        reach = Bullet.radius + ast_extent[a]
+        hit = (off * off).sum(-1) < reach * reach
+        if hit.any():
+            games, slots = ast_games[a[hit]], ast_slots[a[hit]]
+            hit[hit] = circleHulls(bul_pos[b[hit]], Bullet.radius,
+                                   ast_pos[a[hit]], self.ast_level[games, slots],
+                                   self.ast_shape[games, slots],
+                                   self.ast_angle[games, slots])
+        return hit, b, a
+
+    def splitAsteroids(self, games, slots):
+        """Spawn the pieces of split Asteroids like Asteroid.splitFrom
+
+        Arguments:
+        games -- game of each Asteroid being split
+        slots -- slot each Asteroid being split was in
+        """
+        level = self.ast_level[games, slots]
+        keep = level > 0
+        games, slots, level = games[keep], slots[keep], level[keep]
+        vel = self.ast_vel[games, slots]
+        radius = RADII[level]
+        new_radius = RADII[level - 1]
+        num_to_create = (radius // new_radius).astype(np.int64)
+        spawn_angle = self.rng.integers(
+            Asteroid.split_angle_min, Asteroid.split_angle_max, len(games))
+        speed_sq = (vel * vel).sum(-1)
+        new_vel_mag = (len(Asteroid.radii) - (level - 1)) * \
+            (radius * np.sqrt(speed_sq)) / (num_to_create * new_radius)
+
+        parent, i = expand(num_to_create)
+        base_vec = rotate(vel[parent], spawn_angle[parent] / 2)
+        spawn_vel = rotate(base_vec, -i * (spawn_angle[parent] //
+                                           num_to_create[parent]))
+        spawn_vel *= (new_vel_mag[parent] /
+                      np.maximum(np.hypot(*spawn_vel.T), 1e-12))[:, None]
+        new_rot_vel = np.where(
+            speed_sq[parent] > 0, (spawn_vel * spawn_vel).sum(-1) /
+            np.maximum(speed_sq[parent], 1e-12), 0) * \
+            self.ast_rot_vel[games, slots][parent]
+        self.addAsteroids(games[parent], self.ast_pos[games, slots][parent],
+                          spawn_vel, new_rot_vel, level[parent] - 1)
+
+    def spawnAsteroids(self):
+        """Spawn Asteroids in games with too few, like Asteroid.genAsteroid"""
+        missing = self.asteroid_spawn_count - self.ast_alive.sum(axis=1)
+        games = np.repeat(np.arange(self.num_envs), np.maximum(missing, 0))
+        if not len(games):
+            return
+        rng = self.rng
+        count = len(games)
+        side = rng.integers(4, size=count)  # Choose what side to start on
+        pos = np.stack((rng.integers(SCREEN_WIDTH, size=count),
+                        rng.integers(SCREEN_HEIGHT, size=count)),
+                       axis=-1).astype(np.float64)
+        level = rng.integers(len(Asteroid.radii), size=count)
+        div_by = level + 1  # Scale velocity by radius of asteroid
+        across = rng.integers(-AST_SPEED_MAX // div_by, AST_SPEED_MAX // div_by)
+        inward = rng.integers(AST_SPEED_MIN // div_by, AST_SPEED_MAX // div_by)
+        radius = RADII[level]
+        # Top, right, bottom, left
+        pos[:, 1] = np.where(side == 0, -radius, pos[:, 1])
+        pos[:, 0] = np.where(side == 1, SCREEN_WIDTH + radius, pos[:, 0])
+        pos[:, 1] = np.where(side == 2, SCREEN_HEIGHT + radius, pos[:, 1])
+        pos[:, 0] = np.where(side == 3, -radius, pos[:, 0])
+        horizontal = (side == 1) | (side == 3)
+        vel = np.stack((np.where(horizontal, inward, across),
+                        np.where(horizontal, across, inward)),
+                       axis=-1).astype(np.float64)
+        vel[side == 1, 0] *= -1
+        vel[side == 2, 1] *= -1
+        rot_vel = Asteroid.rot_vel_lim * \
+            (vel * vel).sum(-1) / (AST_SPEED_MAX * AST_SPEED_MAX)
+        self.addAsteroids(games, pos, vel, rot_vel, level)
+
+    def addAsteroids(self, games, pos, vel, rot_vel, level):
+        """Place new Asteroids into free slots like Asteroid.__init__
+
+        Asteroids that don't fit in their game's slots are dropped.
+
+        Arguments:
+        games -- game to add each Asteroid to
+        pos -- (C, 2) initial positions
+        vel -- (C, 2) initial velocities
+        rot_vel -- rotational velocities
+        level -- which level of radius each Asteroid is
+        """
+        fits, slots = allocate(self.ast_alive, games)
+        games, pos, vel = games[fits], pos[fits], vel[fits]
+        rot_vel, level = rot_vel[fits], level[fits]
+        rot_vel = np.clip(rot_vel, -Asteroid.rot_vel_lim, Asteroid.rot_vel_lim)
+        speed = np.hypot(vel[:, 0], vel[:, 1])
+        vel = vel * (np.minimum(speed, Asteroid.vel_lim) /
+                     np.maximum(speed, 1e-12))[:, None]
+        radius = RADII[level]
+        shape = self.rng.integers(NUM_TEMPLATES, size=len(games))
+        extent = TEMPLATE_EXTENTS[level, shape]
+        self.ast_alive[games, slots] = True
+        self.ast_pos[games, slots] = pos
+        self.ast_prev_pos[games, slots] = pos
+        self.ast_vel[games, slots] = vel
+        self.ast_angle[games, slots] = 0
+        self.ast_rot_vel[games, slots] = rot_vel
+        self.ast_level[games, slots] = level
+        self.ast_radius[games, slots] = radius
+        self.ast_shape[games, slots] = shape
+        self.ast_extent[games, slots] = extent
+        self.ast_reenter[games, slots] = \
+            (pos[:, 0] + extent < 0) | (pos[:, 0] - extent > SCREEN_WIDTH) | \
+            (pos[:, 1] + extent < 0) | (pos[:, 1] - extent > SCREEN_HEIGHT)
+
+
+def allocate(alive, games):
+    """Find free slots for new entities
+
+    Arguments:
+    alive -- (num_envs, slots) mask of used slots
+    games -- game each new entity goes into
+
+    Returns a mask of which new entities fit and the slot of each that does
+    """
+    order = np.argsort(games, kind="stable")
+    sorted_games = games[order]
+    first = np.searchsorted(sorted_games, sorted_games, "left")
+    rank = np.empty(len(games), dtype=np.int64)
+    rank[order] = np.arange(len(games)) - first  # Index among its game's new
+    free_slots = np.argsort(alive, axis=1, kind="stable")  # Free slots first
+    num_free = (~alive).sum(axis=1)
+    fits = rank < num_free[games]
+    return fits, free_slots[games[fits], rank[fits]]
@@ -0,0 +1,325 @@
+import contextlib
+import pygame
+import random
+import numpy as np
+from ship import Ship
+from asteroid import Asteroid
+from asteroidfield import AsteroidField
+from bullet import Bullet, BulletPool
+from collision import COLLISION_MODES, circleHulls, shipHulls, \
+    sweptCircles, sweptPolygons
+from episodelog import EpisodeLog
+from observation import observe
+from snapshot import restore, snapshot
+from spatialgrid import SpatialGrid
+vec2 = pygame.math.Vector2
+
+SCREEN_WIDTH = 900
+SCREEN_HEIGHT = 700
+MIN_ASTEROIDS = 7
+DIFFICULTY_INCREASE_THRESHOLD = 15
+ASTEROID_DIFFICULTY_INCREMENT = 3
+TICK_RATE = 60  # Simulation ticks per simulated second
+# Entities were tuned for play() feeding 1 / milliseconds per frame into
+# update() at 60 FPS, so a simulated second advances them by 60 / 1000 * 60
+SPEED_PER_SECOND = 3.6
+MAX_FRAME_TIME = 0.25  # Longest frame advance() will catch up on, in seconds
+NO_PHASE = contextlib.nullcontext()  # phase() when nothing is timing
+
+
+class World:
+
+    def __init__(self, surface=None, tick_rate=TICK_RATE, seed=None,
+                 record=False, collisions="discrete"):
+        """Create a World object holding the full state of one game
+
+        Arguments:
+        surface -- pygame.Surface entities draw to. None to run headless
+        tick_rate -- Number of fixed simulation ticks per simulated second
+        seed -- seed of the first game, see reset()
+        record -- keep an EpisodeLog of each game in log
+        collisions -- one of collision.COLLISION_MODES
+        """
+        if collisions not in COLLISION_MODES:
+            raise ValueError("unknown collision mode %r" % collisions)
+        self.surface = surface
+        self.collisions = collisions
+        self.record = record
+        self.log = None  # EpisodeLog of this game if recording
+        self.seed = None  # Seed this game was reset with
+        # Independent streams so changing one kind of draw leaves the others
+        self.spawn_rng = random.Random()
+        self.shape_rng = random.Random()
+        self.split_rng = random.Random()
+        self.tick_rate = tick_rate
+        self.tick_dt = SPEED_PER_SECOND / tick_rate  # dt passed to update()
+        self.ticks = 0  # Ticks simulated since reset
+        self.accumulator = 0  # Real time not yet simulated, in seconds
+        self.alpha = 0  # Fraction of a tick left in accumulator, for drawing
+        self.ship = Ship(surface, vec2(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2))
+        self.ship.setSpawnBullet(self.spawnBullet)
+        self.bullets = []
+        self.bullet_pool = BulletPool(surface)  # Reused for every shot
+        self.asteroids = AsteroidField(surface)
+        self.grid = SpatialGrid()  # Broad phase for collisions
+        self.score = 0
+        self.maxscore = 0
+        self.asteroid_spawn_count = MIN_ASTEROIDS
+        self.timer = None  # Times the phases of step() when set, see phase()
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """Reset entities and score to the start of a new game
+
+        Arguments:
+        seed -- integer in [0, 2**64) every random draw of the game follows
+                from. None to draw one from the random module
+        """
+        if seed is None:
+            seed = random.randrange(2**64)
+        self.seed = seed
+        self.spawn_rng.seed("%d:spawn" % seed)
+        self.shape_rng.seed("%d:shape" % seed)
+        self.split_rng.seed("%d:split" % seed)
+        self.log = EpisodeLog(seed, self.tick_rate, self.collisions) \
+            if self.record else None
+        self.ship.reset(vec2(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2))
+        self.ticks = 0
+        self.accumulator = 0
+        self.alpha = 0
+        self.bullet_pool.release(self.bullets)
+        self.bullets = []
+        self.score = 0
+        self.asteroids.clear()
+        self.asteroid_spawn_count = MIN_ASTEROIDS
+        self.spawnAsteroids()
+
+    def step(self, actions=None):
+        """Advance the game by one fixed tick without drawing anything
+
+        Arguments:
+        actions -- (accel, left, right, shoot) tuple to set the Ship controls
+                   to, or None to let the Ship's Controller set them
+
+        Returns False if the Ship collided with an Asteroid this tick
+        """
+        if actions is not None:
+            self.ship.setControls(*actions)
+        else:
+            self.ship.controller.act(self)
+        if self.log is not None:
+            self.log.record(self.ship)
+
+        dt = self.tick_dt
+        self.ticks += 1
+        with self.phase("ship"):
+            self.ship.update(dt, self.time())
+        with self.phase("asteroids"):
+            self.asteroids.update(dt)
+        with self.phase("bullets"):
+            gone = [bullet for bullet in self.bullets if bullet.update(dt)]
+            if gone and self.collisions in ("discrete", "hull"):
+                self.removeBullets(gone)
+
+        with self.phase("collisions"):
+            alive = self.checkCollisions()
+        if gone:  # Swept Bullets can still hit on their way off the screen
+            self.removeBullets(gone)
+        with self.phase("spawn"):
+            self.spawnAsteroids()
+        return alive
+
+    def phase(self, name):
+        """Get a context manager timing a phase of step() with timer
+
+        Arguments:
+        name -- name of the phase, timer.phase(name) gives the context
+        """
+        if self.timer is None:
+            return NO_PHASE
+        return self.timer.phase(name)
+
+    def advance(self, frame_time):
+        """Run as many fixed ticks as fit in the real time that has passed
+
+        Leftover time is carried to the next call and its fraction of a tick
+        is kept in alpha for interpolated drawing.
+
+        Arguments:
+        frame_time -- Real time passed since the last call, in seconds
+
+        Returns False if the Ship collided with an Asteroid in any tick
+        """
+        alive = True
+        tick_time = 1 / self.tick_rate
+        self.accumulator += min(frame_time, MAX_FRAME_TIME)
+        while self.accumulator >= tick_time:
+            alive = self.step() and alive
+            self.accumulator -= tick_time
+        self.alpha = self.accumulator / tick_time
+        return alive
+
+    @classmethod
+    def replay(cls, log, surface=None):
+        """Play back an EpisodeLog as fast as possible
+
+        Arguments:
+        log -- EpisodeLog to play back
+        surface -- passed on to the World, None to run headless
+
+        Returns the World as it was after the last tick of the log
+        """
+        world = cls(surface, tick_rate=log.tick_rate, seed=log.seed,
+                    collisions=log.collisions)
+        for controls in log.controls():
+            world.step(controls)
+        return world
+
+    def snapshot(self, out=None, rng=True):
+        """Get the full simulation state as an array, see snapshot.snapshot"""
+        return snapshot(self, out, rng)
+
+    def restore(self, snap, rng=True):
+        """Go back to the state of a snapshot(), see snapshot.restore"""
+        restore(self, snap, rng)
+
+    def observe(self):
+        """Get the observation of this game, see observation.observe"""
+        n = len(self.asteroids)
+        ship = self.ship
+        return observe(np.array([ship.pos]), np.array([ship.vel]),
+                       np.array([ship.dir]), self.asteroids.pos[None, :n],
+                       self.asteroids.vel[None, :n],
+                       self.asteroids.radius[None, :n],
+                       np.ones((1, n), dtype=bool))[0]
+
+    def time(self):
+        """Get the simulated time since reset in seconds"""
+        return self.ticks / self.tick_rate
+
+    def checkCollisions(self):
+        """Handle collisions between entities
+
+        Returns False if the Ship has collided with an Asteroid
+        """
+        asteroids = self.asteroids
+        n = len(asteroids)
+        pos = asteroids.pos[:n]
+        prev_pos = asteroids.prev_pos[:n]
+        radius = asteroids.radius[:n]
+        polygon = self.collisions == "polygon"
+        hull = self.collisions == "hull"
+        # Outlines can poke out past radius, up to extent
+        extent = asteroids.extent[:n]
+        self.grid.build(pos, extent if polygon or hull else radius)
+
+        # Check ship collisions
+        ship_pos = np.array([self.ship.pos])
+        if self.collisions == "discrete":
+            _, near = self.grid.query(ship_pos, Ship.size / 2)
+            ship_dist = np.linalg.norm(pos[near] - ship_pos, axis=-1)
+            ship_hit = ship_dist < (Ship.size / 2) + radius[near]
+        elif hull:
+            # Reject by bounding circles, Ship's corners are all size / 2 out
+            _, near = self.grid.query(ship_pos, Ship.size / 2)
+            ship_dist = np.linalg.norm(pos[near] - ship_pos, axis=-1)
+            near = near[ship_dist < (Ship.size / 2) + extent[near]]
+            ship_dir = np.array([self.ship.dir])
+            ship_hit = shipHulls(ship_pos.repeat(len(near), axis=0),
+                                 ship_dir.repeat(len(near), axis=0), pos[near],
+                                 asteroids.level[near], asteroids.shape[near],
+                                 asteroids.angle[near])
+        else:
+            ship_prev = np.array([self.ship.prev_pos])
+            s, near = self.sweptQuery(ship_prev, ship_pos, Ship.size / 2)
+            ship_hit = sweptCircles(ship_prev[s], ship_pos[s], prev_pos[near],
+                                    pos[near], (Ship.size / 2) + radius[near])
+        if ship_hit.any():
+            self.ship.setDead(True)
+            return False
+        if not self.bullets:
+            return True
+
+        bullet_pos = np.array([bullet.pos for bullet in self.bullets])
+        if self.collisions == "discrete":
+            b, a = self.grid.query(bullet_pos, Bullet.radius)
+            dist = np.linalg.norm(pos[a] - bullet_pos[b], axis=-1)
+            hit = dist < Bullet.radius + radius[a]
+        elif hull:
+            b, a = self.grid.query(bullet_pos, Bullet.radius)
+            dist = np.linalg.norm(pos[a] - bullet_pos[b], axis=-1)
+            hit = dist < Bullet.radius + extent[a]
+            if hit.any():
+                hit[hit] = circleHulls(bullet_pos[b[hit]], Bullet.radius,
+                                       pos[a[hit]], asteroids.level[a[hit]],
+                                       asteroids.shape[a[hit]],
+                                       asteroids.angle[a[hit]])
+        else:
+            bullet_prev = np.array([bullet.prev_pos for bullet in self.bullets])
+            b, a = self.sweptQuery(bullet_prev, bullet_pos, Bullet.radius)
+            reach = Bullet.radius + \
+                (asteroids.extent[a] if polygon else radius[a])
+            hit = sweptCircles(bullet_prev[b], bullet_pos[b], prev_pos[a],
+                               pos[a], reach)
+            if polygon and hit.any():
+                outline = asteroids.verts[a[hit]] - pos[a[hit], None, :]
+                hit[hit] = sweptPolygons(bullet_prev[b[hit]],
+                                         bullet_pos[b[hit]],
+                                         prev_pos[a[hit]], pos[a[hit]],
+                                         outline)
+        if not hit.any():
+            return True
+        self.removeBullets([self.bullets[i] for i in b[hit]])
+        hit_asts = np.unique(a[hit])
+        with self.phase("split"):
+            for i in hit_asts:
+                self.score += 1
+                if self.score % DIFFICULTY_INCREASE_THRESHOLD == 0:
+                    self.asteroid_spawn_count += ASTEROID_DIFFICULTY_INCREMENT
+                self.maxscore = max(self.score, self.maxscore)
+                asteroids.split(i, self.split_rng, self.shape_rng)
+            asteroids.remove(hit_asts)
+        return True
+
+    def sweptQuery(self, start, end, radius):
+        """Find Asteroids that may touch circles moving over the last tick
+
+        Arguments:
+        start -- (M, 2) circle centers at the start of the tick
+        end -- (M, 2) circle centers at the end of the tick
+        radius -- radius shared by the circles
+
+        Returns candidate pairs like SpatialGrid.query
+        """
+        # Reach far enough to cover both paths, Asteroids move at most
+        # vel_lim a tick
+        reach = radius + np.linalg.norm(end - start, axis=-1) / 2 + \
+            Asteroid.vel_lim * self.tick_dt
+        return self.grid.query((start + end) / 2, reach)
+
+    def removeBullets(self, dead):
+        """Take Bullets out of play and return them to the pool
+
+        Arguments:
+        dead -- Bullets to remove, any already removed are skipped
+        """
+        dead = set(dead)
+        self.bullet_pool.release(
+            [bullet for bullet in self.bullets if bullet in dead])
+        self.bullets = [bullet for bullet in self.bullets
+                        if bullet not in dead]
+
+    def spawnAsteroids(self):
+        """Spawn more Asteroids if too few exist"""
+        for i in range(self.asteroid_spawn_count - len(self.asteroids)):
+            self.asteroids.spawn(
+                *Asteroid.genParams(self.spawn_rng, self.shape_rng))
+
+    def spawnBullet(self, pos, dir):
+        """Spawn a Bullet, used as the Ship's spawnBullet callback
+
+        Arguments:
+        pos -- Initial position of Bullet
+        dir -- Direction Bullet is traveling
+        """
+        self.bullets.append(self.bullet_pool.acquire(pos, dir))